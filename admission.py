@@ -0,0 +1,119 @@
+import contextvars
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+import metrics
+
+# Forward passes allowed to run at once across all sessions; more than a couple
+# only makes PyTorch threads fight over the same cores
+MAX_CONCURRENT = int(os.environ.get("NAZAR_MAX_CONCURRENT_INFERENCE", "2"))
+
+# Forward passes allowed to wait per priority level; further ones are rejected
+MAX_QUEUE = int(os.environ.get("NAZAR_ADMISSION_QUEUE", "32"))
+
+# Seconds a forward pass may wait for a slot before it is rejected
+WAIT_SECONDS = float(os.environ.get("NAZAR_ADMISSION_WAIT_SECONDS", "10"))
+
+# Lower numbers go first
+INTERACTIVE = 0
+BATCH = 1
+BACKGROUND = 2
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch", BACKGROUND: "background"}
+
+_cond = threading.Condition()
+_running = 0
+_waiting = []
+_sequence = itertools.count()
+# Moving average of how long a slot is held, for retry hints
+_service_seconds = 0.05
+
+_priority = contextvars.ContextVar("nazar_priority", default=BATCH)
+
+
+class Rejected(RuntimeError):
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Inference is busy ({reason}); retry in {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def queue_depth():
+    with _cond:
+        return len(_waiting)
+
+
+def running():
+    with _cond:
+        return _running
+
+
+metrics.register_gauge("nazar_queue_depth", lambda: {(("queue", "admission"),): queue_depth()})
+metrics.register_gauge("nazar_inference_running", lambda: {(): running()})
+
+
+# Forward passes started inside this block get the given priority
+@contextmanager
+def priority(level):
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def _reject(reason, level):
+    # Roughly when the work queued ahead of this request will have drained
+    retry_after = max(1, math.ceil((len(_waiting) / MAX_CONCURRENT + 1) * _service_seconds))
+    metrics.inc("nazar_admission_rejections_total", reason=reason, priority=PRIORITY_NAMES[level])
+    raise Rejected(reason, retry_after)
+
+
+# Wait for an inference slot, highest priority first; raises Rejected when the queue
+# for this priority is full or no slot frees up in time. Returns a token for release().
+def acquire(timeout=None):
+    global _running
+    level = _priority.get()
+    deadline = time.monotonic() + (WAIT_SECONDS if timeout is None else timeout)
+    with _cond:
+        if _running < MAX_CONCURRENT and not _waiting:
+            _running += 1
+            return time.perf_counter()
+        if sum(1 for waiting_level, _ in _waiting if waiting_level <= level) >= MAX_QUEUE:
+            _reject("queue_full", level)
+        ticket = (level, next(_sequence))
+        heapq.heappush(_waiting, ticket)
+        while _running >= MAX_CONCURRENT or _waiting[0] != ticket:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                _waiting.remove(ticket)
+                heapq.heapify(_waiting)
+                _cond.notify_all()
+                _reject("timeout", level)
+            _cond.wait(remaining)
+        heapq.heappop(_waiting)
+        _running += 1
+        # The next waiter may fit too if more than one slot is free
+        _cond.notify_all()
+        return time.perf_counter()
+
+
+def release(token):
+    global _running, _service_seconds
+    with _cond:
+        _running -= 1
+        _service_seconds = 0.8 * _service_seconds + 0.2 * (time.perf_counter() - token)
+        _cond.notify_all()
+
+
+@contextmanager
+def slot(timeout=None):
+    token = acquire(timeout)
+    try:
+        yield
+    finally:
+        release(token)
@@ -0,0 +1,105 @@
+import io
+from collections import Counter, OrderedDict
+from datetime import datetime
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+CONFIDENCE_BINS = 10
+
+# Toxic rate is tracked per minute for the most recent MAX_WINDOWS minutes
+MAX_WINDOWS = 120
+
+LABEL_COLORS = {"Toxic": "#ef4444", "Clean": "#10b981"}
+
+
+def window_key(timestamp):
+    return timestamp[:16]
+
+
+def confidence_bin(confidence):
+    return min(int(confidence * CONFIDENCE_BINS), CONFIDENCE_BINS - 1)
+
+
+# Running label counts, confidence histogram and per-minute toxic rate, updated
+# one prediction at a time. Rendered charts are cached until the next update.
+class Aggregates:
+    def __init__(self):
+        self.label_counts = Counter()
+        self.confidence_bins = [0] * CONFIDENCE_BINS
+        self.windows = OrderedDict()
+        self.version = 0
+        self._charts = {}
+
+    @property
+    def total(self):
+        return sum(self.label_counts.values())
+
+    def add(self, label, confidence, timestamp=None, count=1):
+        timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.label_counts[label] += count
+        self.confidence_bins[confidence_bin(confidence)] += count
+        key = window_key(timestamp)
+        window = self.windows.get(key)
+        if window is None:
+            window = self.windows[key] = [0, 0]
+            if len(self.windows) > MAX_WINDOWS:
+                self.windows.popitem(last=False)
+        window[0] += count
+        window[1] += count if label == "Toxic" else 0
+        self.version += 1
+
+    def toxic_rate_by_window(self):
+        return OrderedDict((key, toxic / total) for key, (total, toxic) in self.windows.items() if total)
+
+    def _cached(self, name, draw):
+        cached = self._charts.get(name)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        fig, ax = plt.subplots(figsize=(6, 6))
+        draw(ax)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", bbox_inches="tight")
+        plt.close(fig)
+        self._charts[name] = (self.version, buffer.getvalue())
+        return self._charts[name][1]
+
+    def pie_chart(self, title):
+        def draw(ax):
+            labels = sorted(self.label_counts)
+            ax.pie(
+                [self.label_counts[label] for label in labels],
+                labels=labels,
+                autopct="%1.1f%%",
+                startangle=90,
+                colors=[LABEL_COLORS.get(label, "#9ca3af") for label in labels],
+            )
+            ax.set_title(title)
+        return self._cached(("pie", title), draw)
+
+    def confidence_chart(self, title):
+        def draw(ax):
+            ax.bar([(i + 0.5) / CONFIDENCE_BINS for i in range(CONFIDENCE_BINS)], self.confidence_bins,
+                   width=1 / CONFIDENCE_BINS, color="#ef4444", edgecolor="white")
+            ax.set_xlabel("Toxic confidence")
+            ax.set_ylabel("Comments")
+            ax.set_title(title)
+        return self._cached(("confidence", title), draw)
+
+
+# Build aggregates from (label, confidence bin, minute, count) groups in minute order
+def from_groups(groups):
+    aggregates = Aggregates()
+    for label, bin_index, minute, count in groups:
+        aggregates.add(label, (bin_index + 0.5) / CONFIDENCE_BINS, minute, count)
+    return aggregates
+
+
+def from_dataframe(df):
+    aggregates = Aggregates()
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    for (label, bin_index), count in df.groupby(
+        [df["label"], df["confidence"].map(confidence_bin)]
+    ).size().items():
+        aggregates.add(label, (bin_index + 0.5) / CONFIDENCE_BINS, timestamp, count)
+    return aggregates
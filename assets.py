@@ -0,0 +1,113 @@
+import base64
+import io
+import os
+from functools import lru_cache
+import numpy as np
+from PIL import Image
+
+
+# Make white and light-gray pixels transparent, working on the whole image as an array
+def remove_background_image(img, threshold_value=240):
+    rgba = np.asarray(img.convert("RGBA"))
+    rgb = rgba[:, :, :3].astype(np.int16)
+    r, g, b = rgb[:, :, 0], rgb[:, :, 1], rgb[:, :, 2]
+
+    # Same rules as the old per-pixel loop: whitish pixels, or gray pixels a bit below the threshold
+    whiteness = rgb.sum(axis=2) / 3
+    gray = (np.abs(r - g) < 20) & (np.abs(r - b) < 20) & (np.abs(g - b) < 20)
+    transparent = (whiteness > threshold_value) | (gray & (whiteness > threshold_value - 40))
+
+    result = rgba.copy()
+    result[transparent] = (255, 255, 255, 0)
+    return Image.fromarray(result, "RGBA")
+
+
+@lru_cache(maxsize=32)
+def _remove_background_base64(image_path, threshold_value, mtime):
+    with Image.open(image_path) as img:
+        result = remove_background_image(img, threshold_value)
+    buffered = io.BytesIO()
+    result.save(buffered, format="PNG")
+    return base64.b64encode(buffered.getvalue()).decode("utf-8")
+
+
+# Base64 PNG of an image with its background removed, cached per (path, threshold, mtime)
+def remove_background_base64(image_path, threshold_value=240):
+    return _remove_background_base64(image_path, threshold_value, os.path.getmtime(image_path))
+
+
+# Variants are encoded at DISPLAY_SCALE times their CSS size so they stay sharp on high-DPI screens
+DISPLAY_SCALE = 2
+WEBP_QUALITY = 85
+
+
+def _fit(img, width, height):
+    scale = min(
+        width / img.width if width else 1.0,
+        height / img.height if height else 1.0,
+        1.0,
+    )
+    if scale == 1.0:
+        return img
+    return img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))), Image.LANCZOS)
+
+
+@lru_cache(maxsize=64)
+def _variant(image_path, width, height, fmt, mtime):
+    with Image.open(image_path) as img:
+        img.load()
+        resized = _fit(img, width, height)
+    buffered = io.BytesIO()
+    if fmt == "WEBP":
+        resized.save(buffered, format="WEBP", quality=WEBP_QUALITY, method=6)
+    else:
+        resized.save(buffered, format=fmt, optimize=True)
+    return buffered.getvalue()
+
+
+# Encoded bytes of an image resized to fit a display box (in CSS pixels), cached per mtime
+def variant(image_path, width=None, height=None, fmt="WEBP"):
+    return _variant(
+        image_path,
+        width and width * DISPLAY_SCALE,
+        height and height * DISPLAY_SCALE,
+        fmt.upper(),
+        os.path.getmtime(image_path),
+    )
+
+
+@lru_cache(maxsize=64)
+def _data_uri(image_path, width, height, fmt, mtime):
+    encoded = base64.b64encode(variant(image_path, width, height, fmt)).decode("utf-8")
+    return f"data:image/{fmt.lower()};base64,{encoded}"
+
+
+# data: URI of a display-size variant, for inlining into HTML
+def data_uri(image_path, width=None, height=None, fmt="WEBP"):
+    return _data_uri(image_path, width, height, fmt.upper(), os.path.getmtime(image_path))
+
+
+# Images the app shows, with the box each is displayed in
+DISPLAY_SIZES = {
+    "logo.png": {"height": 600},
+    "images/image1.png": {"width": 600},
+}
+
+
+# Encode every display variant up front, so the first page view does not pay for it
+def prepare():
+    for image_path, size in DISPLAY_SIZES.items():
+        if os.path.exists(image_path):
+            variant(image_path, **size)
+
+
+def main():
+    for image_path, size in DISPLAY_SIZES.items():
+        original = os.path.getsize(image_path)
+        for fmt in ("WEBP", "PNG"):
+            encoded = len(variant(image_path, fmt=fmt, **size))
+            print(f"{image_path:20} {fmt:5} {original:>10,} -> {encoded:>9,} bytes ({encoded / original:.1%})")
+
+
+if __name__ == "__main__":
+    main()
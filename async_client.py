@@ -0,0 +1,118 @@
+import asyncio
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from classifier import load_model, predict_texts
+import capture
+import metrics
+
+# asyncio front end for the classifier. Model work runs on a small thread pool in
+# this process, so it shares the loaded model (and its hot swaps) and the explain
+# cache with a Streamlit app running alongside.
+
+# Threads running model work; extra calls wait for a free thread
+MAX_WORKERS = int(os.environ.get("NAZAR_ASYNC_WORKERS", "2"))
+
+# Seconds a call waits for its results before raising TimeoutError; 0 waits forever
+DEFAULT_TIMEOUT = float(os.environ.get("NAZAR_ASYNC_TIMEOUT", "30"))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="nazar-async")
+_lock = threading.Lock()
+
+# Per event loop: text -> the job computing it, so concurrent calls share one computation
+_pending = weakref.WeakKeyDictionary()
+
+
+# One batch of texts sent to the executor, and how many calls are waiting on it
+class _Job:
+    def __init__(self, texts, future):
+        self.texts = texts
+        self.future = future
+        self.waiters = 0
+        self.results = None
+
+    def result_for(self, text):
+        if self.results is None:
+            self.results = dict(zip(self.texts, self.future.result()))
+        return self.results[text]
+
+
+def _pending_jobs(loop):
+    with _lock:
+        jobs = _pending.get(loop)
+        if jobs is None:
+            jobs = _pending[loop] = {}
+        return jobs
+
+
+def queue_depth():
+    with _lock:
+        return sum(len({id(job) for job in jobs.values()}) for jobs in _pending.values())
+
+
+metrics.register_gauge("nazar_queue_depth", lambda: {(("queue", "async"),): queue_depth()})
+
+
+def _forget(jobs, job):
+    for text in job.texts:
+        if jobs.get(text) is job:
+            del jobs[text]
+
+
+def _submit(loop, jobs, texts):
+    job = _Job(texts, loop.run_in_executor(_executor, predict_texts, texts))
+    job.future.add_done_callback(lambda _: _forget(jobs, job))
+    for text in texts:
+        jobs[text] = job
+    return job
+
+
+# Classify texts, reusing computations already in flight for any of them. Cancelling
+# or timing out only abandons this call; the work itself is cancelled once no other
+# call is waiting on it and it has not started on a thread yet.
+async def classify_many(texts, timeout=DEFAULT_TIMEOUT):
+    texts = list(texts)
+    if not texts:
+        return []
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    jobs = _pending_jobs(loop)
+
+    missing = [text for text in dict.fromkeys(texts) if text not in jobs]
+    if missing:
+        _submit(loop, jobs, missing)
+    waiting = list({id(jobs[text]): jobs[text] for text in dict.fromkeys(texts)}.values())
+    by_text = {text: jobs[text] for text in texts}
+
+    async def wait_all():
+        for job in waiting:
+            await asyncio.shield(job.future)
+
+    for job in waiting:
+        job.waiters += 1
+    try:
+        await asyncio.wait_for(wait_all(), timeout or None)
+    finally:
+        for job in waiting:
+            job.waiters -= 1
+            if job.waiters == 0 and not job.future.done():
+                # Forgotten right away rather than in the done callback, which runs on a
+                # later loop iteration; a call in between must not join a cancelled job
+                _forget(jobs, job)
+                job.future.cancel()
+    # Each caller gets its own result dicts, since a computation may be shared
+    results = [dict(by_text[text].result_for(text)) for text in texts]
+    # Captured per call, even when its computation was shared with another one
+    capture.record("api", texts, results, time.perf_counter() - start)
+    return results
+
+
+async def classify(text, timeout=DEFAULT_TIMEOUT):
+    return (await classify_many([text], timeout))[0]
+
+
+# Load the model on the executor, so the first call does not pay for it
+async def warm_up():
+    await asyncio.get_running_loop().run_in_executor(_executor, load_model)
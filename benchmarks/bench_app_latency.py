@@ -0,0 +1,66 @@
+import argparse
+import json
+import sys
+import time
+from streamlit.testing.v1 import AppTest
+import instrumentation
+from benchmarks.bench_inference import percentile
+from benchmarks.bench_payload import APP
+from benchmarks.corpus import generate
+
+# Run from the repository root: python -m benchmarks.bench_app_latency --budget-ms 300
+#
+# Submits comments through the single-comment form the way a user would and checks
+# the server-side time from submit to rendered result card against a latency budget.
+
+
+def run(iterations, words, warmup, timeout):
+    app = AppTest.from_file(APP, default_timeout=timeout)
+    app.session_state["active_tab"] = "single_comment"
+    app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+
+    latencies = []
+    for i, text in enumerate(generate(warmup + iterations, words=words, seed=words)):
+        app.text_area(key="comment_textarea").input(text)
+        submit = next(button for button in app.button if button.label == "ANALYZE NOW")
+        start = time.perf_counter()
+        submit.click().run()
+        elapsed = time.perf_counter() - start
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+        if i >= warmup:
+            latencies.append(elapsed)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check single-comment latency through the app against a budget")
+    parser.add_argument("--budget-ms", default=300.0, type=float, help="Maximum allowed p95 submit-to-result time")
+    parser.add_argument("--iterations", default=20, type=int)
+    parser.add_argument("--words", default=32, type=int, help="Comment length in words")
+    parser.add_argument("--warmup", default=2, type=int)
+    parser.add_argument("--timeout", default=120, type=float)
+    args = parser.parse_args()
+
+    latencies = run(args.iterations, args.words, args.warmup, args.timeout)
+    stages = instrumentation.snapshot()
+    result = {
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "budget_ms": args.budget_ms,
+        # Where the time went inside the single-comment request
+        "stages_p95_ms": {
+            key.split("/", 1)[1]: summary["p95"] * 1000
+            for key, summary in stages.items() if key.startswith("single/")
+        },
+    }
+    print(json.dumps(result, indent=2))
+    if result["p95_ms"] > args.budget_ms:
+        print(f"Over budget: p95 {result['p95_ms']:.1f}ms > {args.budget_ms:.1f}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import json
+import time
+import numpy as np
+from PIL import Image
+from assets import remove_background_image
+
+# Run from the repository root: python -m benchmarks.bench_background
+
+
+# The per-pixel loop remove_background used before it was vectorized, kept as the reference
+def remove_background_loop(img, threshold_value=240):
+    img = img.convert("RGBA")
+    new_data = []
+    for item in img.getdata():
+        r, g, b = item[0], item[1], item[2]
+        whiteness = (r + g + b) / 3
+        if whiteness > threshold_value:
+            new_data.append((255, 255, 255, 0))
+        elif abs(r - g) < 20 and abs(r - b) < 20 and abs(g - b) < 20 and whiteness > threshold_value - 40:
+            new_data.append((255, 255, 255, 0))
+        else:
+            new_data.append(item)
+    img.putdata(new_data)
+    return img
+
+
+def best_of(function, img, threshold, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(img, threshold)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-pixel and vectorized background removal")
+    parser.add_argument("images", nargs="*", default=["logo.png", "images/image1.png"])
+    parser.add_argument("--threshold", default=240, type=int)
+    parser.add_argument("--repeat", default=3, type=int)
+    parser.add_argument("--skip-loop", action="store_true", help="Only time the vectorized version")
+    args = parser.parse_args()
+
+    for path in args.images:
+        with Image.open(path) as img:
+            img.load()
+        vectorized_seconds, vectorized = best_of(remove_background_image, img, args.threshold, args.repeat)
+        result = {"image": path, "pixels": img.width * img.height, "vectorized_seconds": vectorized_seconds}
+        if not args.skip_loop:
+            loop_seconds, expected = best_of(remove_background_loop, img, args.threshold, 1)
+            result["loop_seconds"] = loop_seconds
+            result["speedup"] = loop_seconds / vectorized_seconds
+            result["identical"] = bool(np.array_equal(np.asarray(expected), np.asarray(vectorized)))
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
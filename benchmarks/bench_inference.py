@@ -0,0 +1,213 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from types import SimpleNamespace
+import torch
+from classifier import LoadedModel, predict_with, read_model
+from dedup import predict_deduplicated
+from benchmarks.corpus import generate
+
+# Run from the repository root: python -m benchmarks.bench_inference
+
+BACKENDS = ["eager", "quantized", "onnx"]
+CONFIG_KEYS = ["kind", "backend", "threads", "words", "batch_size", "dedup"]
+
+
+def quantize(loaded):
+    model = torch.quantization.quantize_dynamic(loaded.model, {torch.nn.Linear}, dtype=torch.qint8)
+    return LoadedModel(loaded.version + "+int8", loaded.tokenizer, model)
+
+
+# Minimal stand-in for the torch model, backed by an ONNX Runtime session
+class OnnxModel:
+    def __init__(self, session, config):
+        self.session = session
+        self.config = config
+
+    def __call__(self, input_ids, attention_mask, **kwargs):
+        logits = self.session.run(["logits"], {
+            "input_ids": input_ids.numpy(),
+            "attention_mask": attention_mask.numpy(),
+        })[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+def export_onnx(loaded):
+    try:
+        import onnxruntime
+    except ImportError:
+        return None
+    path = os.path.join(tempfile.mkdtemp(), "model.onnx")
+    dummy = loaded.tokenizer(["benchmark"], return_tensors="pt")
+    torch.onnx.export(
+        loaded.model,
+        (dummy["input_ids"], dummy["attention_mask"]),
+        path,
+        input_names=["input_ids", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            "logits": {0: "batch"},
+        },
+        opset_version=14,
+    )
+    session = onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"])
+    return LoadedModel(loaded.version + "+onnx", loaded.tokenizer, OnnxModel(session, loaded.model.config))
+
+
+def build_backends(names, version):
+    eager = read_model(version)
+    backends = {}
+    for name in names:
+        if name == "eager":
+            backends[name] = eager
+        elif name == "quantized":
+            backends[name] = quantize(eager)
+        elif name == "onnx":
+            onnx = export_onnx(eager)
+            if onnx is None:
+                print("Skipping onnx backend: onnxruntime is not installed")
+            else:
+                backends[name] = onnx
+        else:
+            raise ValueError(f"Unknown backend: {name}")
+    return backends
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def time_single(loaded, texts, warmup):
+    for text in texts[:warmup]:
+        predict_with(loaded, [text])
+    latencies = []
+    for text in texts:
+        start = time.perf_counter()
+        predict_with(loaded, [text])
+        latencies.append(time.perf_counter() - start)
+    return {
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def time_batches(loaded, texts, batch_size, dedup, warmup):
+    def predict(batch):
+        return predict_with(loaded, batch)
+
+    def run(batch):
+        return predict_deduplicated(batch, predict) if dedup else predict(batch)
+
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    for batch in batches[:warmup]:
+        run(batch)
+    start = time.perf_counter()
+    for batch in batches:
+        run(batch)
+    elapsed = time.perf_counter() - start
+    return {"rows_per_second": len(texts) / elapsed}
+
+
+def run_suite(args):
+    backends = build_backends(args.backends, args.version)
+    results = []
+    for threads in args.threads:
+        torch.set_num_threads(threads)
+        for backend, loaded in backends.items():
+            for words in args.words:
+                single_texts = generate(args.iterations, words=words, seed=words)
+                result = {"kind": "single", "backend": backend, "threads": threads, "words": words,
+                          "batch_size": 1, "dedup": False}
+                result.update(time_single(loaded, single_texts, args.warmup))
+                results.append(result)
+                print(json.dumps(result))
+
+                batch_texts = generate(args.rows, words=words, duplicate_ratio=args.duplicate_ratio, seed=words)
+                for batch_size in args.batch_sizes:
+                    for dedup in ([False, True] if args.dedup else [False]):
+                        result = {"kind": "batch", "backend": backend, "threads": threads, "words": words,
+                                  "batch_size": batch_size, "dedup": dedup}
+                        result.update(time_batches(loaded, batch_texts, batch_size, dedup, args.warmup))
+                        results.append(result)
+                        print(json.dumps(result))
+    return {
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "machine": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+# Flag configurations whose p95 latency rose or throughput fell by more than `tolerance`
+def compare(current, baseline, tolerance):
+    baseline_results = {tuple(r[k] for k in CONFIG_KEYS): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        before = baseline_results.get(tuple(result[k] for k in CONFIG_KEYS))
+        if before is None:
+            continue
+        if result["kind"] == "single":
+            change = result["p95_ms"] / before["p95_ms"] - 1
+            regressed = change > tolerance
+            summary = f"p95 {before['p95_ms']:.2f}ms -> {result['p95_ms']:.2f}ms ({change:+.1%})"
+        else:
+            change = result["rows_per_second"] / before["rows_per_second"] - 1
+            regressed = change < -tolerance
+            summary = f"{before['rows_per_second']:.1f} -> {result['rows_per_second']:.1f} rows/s ({change:+.1%})"
+        config = ", ".join(f"{k}={result[k]}" for k in CONFIG_KEYS)
+        print(f"{'REGRESSION' if regressed else 'ok':10} {config}: {summary}")
+        if regressed:
+            regressions.append(result)
+    return regressions
+
+
+def parse_ints(value):
+    return [int(v) for v in value.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark classifier latency and throughput")
+    parser.add_argument("--version", default=None, help="Registry version to benchmark (default: ./saved_model)")
+    parser.add_argument("--backends", default="eager,quantized,onnx", type=lambda v: v.split(","))
+    parser.add_argument("--batch-sizes", default="1,8,32,128", type=parse_ints)
+    parser.add_argument("--words", default="16,64,256", type=parse_ints, help="Comment lengths in words")
+    parser.add_argument("--threads", default=f"1,{os.cpu_count()}", type=parse_ints)
+    parser.add_argument("--iterations", default=50, type=int, help="Single-comment requests per configuration")
+    parser.add_argument("--rows", default=512, type=int, help="Comments per batch throughput run")
+    parser.add_argument("--warmup", default=3, type=int)
+    parser.add_argument("--duplicate-ratio", default=0.3, type=float,
+                        help="Share of near-duplicate raid comments in batch runs")
+    parser.add_argument("--no-dedup", dest="dedup", action="store_false",
+                        help="Skip the runs with near-duplicate reuse enabled")
+    parser.add_argument("--output", default="benchmarks/results.json")
+    parser.add_argument("--compare", help="Baseline results file to check for regressions")
+    parser.add_argument("--tolerance", default=0.1, type=float)
+    args = parser.parse_args()
+
+    report = run_suite(args)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(report['results'])} results to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
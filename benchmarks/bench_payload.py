@@ -0,0 +1,47 @@
+import argparse
+import json
+import os
+from streamlit import config
+from streamlit.testing.v1 import AppTest
+
+# Run from the repository root: python -m benchmarks.bench_payload
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+TABS = ["about", "single_comment", "upload_csv", "history"]
+
+
+# HTML and markdown bytes the server sends for one rerun of a tab
+def measure(tab, timeout):
+    app = AppTest.from_file(APP, default_timeout=timeout)
+    app.session_state["active_tab"] = tab
+    app.run()
+    if app.exception:
+        raise RuntimeError(f"{tab}: {app.exception[0].message}")
+    # The first run builds per-process caches; measure a steady-state rerun
+    app.run()
+    bodies = [element.value for element in app.markdown]
+    return {
+        "tab": tab,
+        "markdown_elements": len(bodies),
+        "markdown_bytes": sum(len(body.encode("utf-8")) for body in bodies),
+        "style_bytes": sum(len(body.encode("utf-8")) for body in bodies if "<style" in body),
+        "script_bytes": sum(len(body.encode("utf-8")) for body in bodies if "<script" in body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the HTML payload of one rerun per tab")
+    parser.add_argument("--tabs", default=",".join(TABS), type=lambda v: v.split(","))
+    parser.add_argument("--timeout", default=120, type=float)
+    parser.add_argument("--inline", action="store_true",
+                        help="Measure with static serving off, so images are inlined as data: URIs")
+    args = parser.parse_args()
+
+    config.set_option("server.enableStaticServing", not args.inline)
+
+    for tab in args.tabs:
+        print(json.dumps(measure(tab, args.timeout)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import random
+
+# Small Egyptian Arabic vocabulary for generating benchmark comments offline
+NEUTRAL_WORDS = [
+    "الفيلم", "ده", "كان", "حلو", "جدا", "النهارده", "الجو", "في", "مصر", "انا", "رايح",
+    "الشغل", "بكره", "الماتش", "امبارح", "بجد", "الحمد", "لله", "شكرا", "على", "المعلومة",
+    "الاكل", "هنا", "ممتاز", "عايز", "اعرف", "السعر", "كام", "ممكن", "حد", "يساعدني",
+    "الموضوع", "محتاج", "وقت", "الناس", "كلها", "مستنية", "الحلقة", "الجاية", "يا", "جماعة",
+]
+TOXIC_WORDS = ["غبي", "حمار", "تافه", "فاشل", "اسكت", "مش", "محترم", "قليل", "الادب"]
+
+# Diacritics and tatweel that spam waves sprinkle in to dodge exact matching
+NOISE_MARKS = ["\u064e", "\u064f", "\u0650", "\u0651", "\u0640"]
+
+
+def comment(rng, words, toxic=False):
+    tokens = [rng.choice(NEUTRAL_WORDS) for _ in range(words)]
+    if toxic:
+        for _ in range(max(1, words // 8)):
+            tokens[rng.randrange(words)] = rng.choice(TOXIC_WORDS)
+    return " ".join(tokens)
+
+
+def add_noise(rng, text):
+    chars = list(text)
+    for _ in range(max(1, len(chars) // 20)):
+        chars.insert(rng.randrange(len(chars) + 1), rng.choice(NOISE_MARKS))
+    return "".join(chars)
+
+
+# Generate `count` comments of roughly `words` words each. A `duplicate_ratio` share of
+# them are noisy copies of a few raid messages, as seen in spam waves.
+def generate(count, words=20, toxic_ratio=0.3, duplicate_ratio=0.0, seed=0):
+    rng = random.Random(seed)
+    raid_messages = [comment(rng, words, toxic=True) for _ in range(3)]
+    texts = []
+    for _ in range(count):
+        if rng.random() < duplicate_ratio:
+            texts.append(add_noise(rng, rng.choice(raid_messages)))
+        else:
+            texts.append(comment(rng, words, toxic=rng.random() < toxic_ratio))
+    return texts
@@ -0,0 +1,62 @@
+import hashlib
+import os
+from functools import lru_cache
+import streamlit as st
+import assets
+
+# Styles and scripts live in ./static but are always inlined: Streamlit releases that
+# serve app/static through Tornado send every non-image file as text/plain with
+# nosniff, and browsers refuse stylesheets served that way. Only the WebP image
+# variants are served from app/static, when server.enableStaticServing is on.
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STATIC_URL = "app/static"
+
+# Image variants are written here on first use, named by content hash
+GENERATED_DIR = "generated"
+
+
+@lru_cache(maxsize=None)
+def _read(path, mtime):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _asset(relative_path):
+    path = os.path.join(STATIC_DIR, relative_path)
+    return _read(path, os.path.getmtime(path))
+
+
+def _serving():
+    return st.get_option("server.enableStaticServing")
+
+
+# Inline tag for a stylesheet in static/css; the file is read once per change
+def stylesheet(name):
+    return f"<style>\n{_asset('css/' + name)}</style>"
+
+
+def script(name):
+    return f"<script>\n{_asset('js/' + name)}</script>"
+
+
+@lru_cache(maxsize=None)
+def _publish_image(image_path, width, height, mtime):
+    data = assets.variant(image_path, width, height)
+    stem = os.path.splitext(os.path.basename(image_path))[0]
+    name = f"{stem}-{hashlib.sha256(data).hexdigest()[:12]}.webp"
+    path = os.path.join(STATIC_DIR, GENERATED_DIR, name)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written under a temporary name, so a concurrent request never serves half a file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return f"{STATIC_URL}/{GENERATED_DIR}/{name}"
+
+
+# URL of a display-size WebP variant of an image; a data: URI when static serving is off
+def image(image_path, width=None, height=None):
+    if not _serving():
+        return assets.data_uri(image_path, width, height)
+    return _publish_image(image_path, width, height, os.path.getmtime(image_path))
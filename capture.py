@@ -0,0 +1,114 @@
+import glob
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+import metrics
+
+# Requests are appended to this JSONL file in the format replay.py reads; unset disables capture
+CAPTURE_PATH = os.environ.get("NAZAR_CAPTURE_PATH")
+
+# "text" stores comments verbatim (replayable), "hash" stores only their sha256
+CAPTURE_TEXT = os.environ.get("NAZAR_CAPTURE_TEXT", "hash")
+
+# Rotate once the file passes this size or age, keeping BACKUP_COUNT rotated files
+MAX_BYTES = int(os.environ.get("NAZAR_CAPTURE_MAX_BYTES", str(64 * 1024 * 1024)))
+MAX_SECONDS = int(os.environ.get("NAZAR_CAPTURE_MAX_SECONDS", "3600"))
+BACKUP_COUNT = int(os.environ.get("NAZAR_CAPTURE_BACKUP_COUNT", "24"))
+
+# Records waiting for the writer; when full, new records are dropped rather than blocking
+QUEUE_SIZE = 10000
+FLUSH_SECONDS = 1.0
+
+_queue = queue.Queue(maxsize=QUEUE_SIZE)
+_writer = None
+_writer_lock = threading.Lock()
+
+metrics.register_gauge("nazar_queue_depth", lambda: {(("queue", "capture"),): _queue.qsize()})
+
+
+def enabled():
+    return bool(CAPTURE_PATH)
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _rotate(path):
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    root, ext = os.path.splitext(path)
+    os.replace(path, f"{root}-{stamp}{ext}")
+    for old in sorted(glob.glob(f"{root}-*{ext}"))[:-BACKUP_COUNT]:
+        os.remove(old)
+
+
+def _write_loop(path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    opened_at = time.time()
+    while True:
+        # Block for the first record, then drain whatever else arrives within FLUSH_SECONDS
+        items = [_queue.get()]
+        deadline = time.monotonic() + FLUSH_SECONDS
+        while len(items) < 1000:
+            try:
+                items.append(_queue.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        lines = [_format(*item) for item in items]
+        try:
+            if os.path.exists(path) and (os.path.getsize(path) >= MAX_BYTES or time.time() - opened_at >= MAX_SECONDS):
+                _rotate(path)
+                opened_at = time.time()
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+        except OSError as e:
+            print(f"Error writing request capture: {e}")
+            metrics.inc("nazar_capture_dropped_total", len(lines))
+
+
+def _ensure_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_write_loop, args=(CAPTURE_PATH,), daemon=True, name="nazar-capture")
+            _writer.start()
+
+
+def _format(timestamp, entry_point, texts, results, latency_seconds):
+    entry = {
+        "timestamp": timestamp,
+        "entry_point": entry_point,
+        "latency_ms": round(latency_seconds * 1000, 2),
+        "model_version": results[0]["model_version"] if results else None,
+    }
+    if entry_point == "single":
+        key, value = ("text", texts[0]) if CAPTURE_TEXT == "text" else ("text_hash", text_hash(texts[0]))
+        entry[key] = value
+        entry["label"] = results[0]["label"]
+        entry["confidence"] = round(results[0]["confidence"], 4)
+    else:
+        if CAPTURE_TEXT == "text":
+            entry["texts"] = list(texts)
+        else:
+            entry["text_hashes"] = [text_hash(text) for text in texts]
+        entry["labels"] = [result["label"] for result in results]
+        entry["confidences"] = [round(result["confidence"], 4) for result in results]
+    return json.dumps(entry, ensure_ascii=False) + "\n"
+
+
+# Queue one classification request for the capture log. Hashing and serialization
+# happen on the writer thread, so the caller only pays for a queue put.
+def record(entry_point, texts, results, latency_seconds):
+    if not enabled():
+        return
+    _ensure_writer()
+    try:
+        _queue.put_nowait((datetime.now().isoformat(), entry_point, texts, results, latency_seconds))
+    except queue.Full:
+        metrics.inc("nazar_capture_dropped_total")
@@ -0,0 +1,339 @@
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+import torch
+import torch.nn.functional as F
+from transformers import DistilBertTokenizerFast, DistilBertForSequenceClassification
+import registry
+import instrumentation
+import metrics
+import admission
+import cpu_config
+
+# Model served when the registry has no active version
+MODEL_PATH = "./saved_model"
+DEFAULT_VERSION = "saved_model"
+
+# Comments longer than the model max length are split into overlapping windows,
+# each one sharing WINDOW_OVERLAP tokens with the window before it
+WINDOW_OVERLAP = int(os.environ.get("NAZAR_WINDOW_OVERLAP", "128"))
+
+# How window scores are combined into one comment score: "max" or "mean"
+AGGREGATION = os.environ.get("NAZAR_AGGREGATION", "max")
+
+# Upper bound on padded tokens in a single forward pass
+MAX_BATCH_TOKENS = int(os.environ.get("NAZAR_MAX_BATCH_TOKENS", "8192"))
+
+# Score a label must exceed to be flagged, unless the model config or
+# NAZAR_LABEL_THRESHOLDS (e.g. "threat=0.4,insult=0.6") sets its own
+DEFAULT_THRESHOLD = float(os.environ.get("NAZAR_DEFAULT_THRESHOLD", "0.5"))
+
+
+def parse_thresholds(value):
+    thresholds = {}
+    for item in value.split(","):
+        if item.strip():
+            name, threshold = item.split("=")
+            thresholds[name.strip()] = float(threshold)
+    return thresholds
+
+
+THRESHOLD_OVERRIDES = parse_thresholds(os.environ.get("NAZAR_LABEL_THRESHOLDS", ""))
+
+# Token lengths run through a newly loaded model before it serves, so the first real
+# comments at each length do not pay for allocator growth and kernel selection
+WARMUP_LENGTHS = [int(v) for v in os.environ.get("NAZAR_WARMUP_LENGTHS", "16,64,128,256,512").split(",") if v.strip()]
+WARMUP_BATCH_SIZES = (1, 8)
+
+# Seconds between retries of a start-up warm-up that failed; the model serves meanwhile
+WARMUP_RETRY_SECONDS = float(os.environ.get("NAZAR_WARMUP_RETRY_SECONDS", "30"))
+
+LoadedModel = namedtuple("LoadedModel", ["version", "tokenizer", "model"])
+
+# The served model is replaced as a whole tuple, so a request that grabbed it
+# keeps a consistent tokenizer/model/version even while a swap happens
+_loaded = None
+_load_lock = threading.Lock()
+_swap_thread = None
+# (version, registry.version_stamp) of the last version that failed to load
+_failed_version = None
+_status = {"warmup": "pending", "warmup_seconds": None, "last_inference_at": None}
+
+
+def read_model(version):
+    if version is None:
+        path = MODEL_PATH
+        version = DEFAULT_VERSION
+    else:
+        registry.verify(version)
+        path = registry.version_path(version)
+    start = time.perf_counter()
+    tokenizer = DistilBertTokenizerFast.from_pretrained(path)
+    model = DistilBertForSequenceClassification.from_pretrained(path)
+    model.eval()
+    metrics.set_gauge("nazar_model_load_seconds", time.perf_counter() - start, version=version)
+    return LoadedModel(version, tokenizer, model)
+
+
+# Run representative batches at each warm-up length through a model; returns the seconds taken
+def warm_up(loaded):
+    start = time.perf_counter()
+    tokens_per_word = max(1, len(loaded.tokenizer("كلام", add_special_tokens=False)["input_ids"]))
+    max_length = max_window_length(loaded.tokenizer, loaded.model)
+    with admission.priority(admission.BACKGROUND):
+        for length in sorted({min(length, max_length) for length in WARMUP_LENGTHS}):
+            text = " ".join(["كلام"] * max(1, length // tokens_per_word))
+            for batch_size in WARMUP_BATCH_SIZES:
+                predict_with(loaded, [text] * batch_size)
+    return time.perf_counter() - start
+
+
+# Warm-up runs at background priority, so under sustained load admission control can
+# turn it away; that means "try again later", not that the model is broken
+def _warm_up_when_admitted(loaded):
+    while True:
+        try:
+            return warm_up(loaded)
+        except admission.Rejected as e:
+            time.sleep(e.retry_after)
+
+
+# Keep retrying a failed start-up warm-up in the background, so /ready recovers
+def _retry_warm_up(loaded):
+    while _loaded is loaded:
+        time.sleep(WARMUP_RETRY_SECONDS)
+        try:
+            seconds = _warm_up_when_admitted(loaded)
+        except Exception as e:
+            print(f"Warm-up of model {loaded.version} failed again: {e}")
+            continue
+        if _loaded is loaded:
+            _status["warmup_seconds"] = seconds
+            _status["warmup"] = "done"
+        return
+
+
+# Load the active registry version (or MODEL_PATH) once per process, warmed up
+def load_model():
+    global _loaded
+    with _load_lock:
+        if _loaded is None:
+            cpu_config.apply()
+            loaded = read_model(registry.active_version())
+            if WARMUP_LENGTHS:
+                _status["warmup"] = "running"
+                try:
+                    _status["warmup_seconds"] = _warm_up_when_admitted(loaded)
+                    _status["warmup"] = "done"
+                except Exception as e:
+                    print(f"Warm-up of model {loaded.version} failed, retrying in {WARMUP_RETRY_SECONDS:g}s: {e}")
+                    _status["warmup"] = "failed"
+            else:
+                _status["warmup"] = "disabled"
+            _loaded = loaded
+            if _status["warmup"] == "failed":
+                threading.Thread(target=_retry_warm_up, args=(loaded,), daemon=True, name="nazar-warmup").start()
+    return _loaded
+
+
+# Readiness for load balancers: ready once a model is loaded and warmed up
+def status():
+    loaded = _loaded
+    last = _status["last_inference_at"]
+    return {
+        "ready": loaded is not None and _status["warmup"] in ("done", "disabled"),
+        "model_version": loaded.version if loaded is not None else None,
+        "warmup": _status["warmup"],
+        "warmup_seconds": _status["warmup_seconds"],
+        "last_inference_at": datetime.fromtimestamp(last).strftime("%Y-%m-%d %H:%M:%S") if last else None,
+        "seconds_since_inference": time.time() - last if last else None,
+    }
+
+
+metrics.register_health(status)
+metrics.register_gauge("nazar_ready", lambda: {(): int(status()["ready"])})
+
+
+def _swap_to(version):
+    global _loaded, _failed_version
+    stamp = registry.version_stamp(version)
+    try:
+        replacement = read_model(version)
+        # Warm the new version up before it takes traffic; while admission control turns
+        # the warm-up away, the current model keeps serving and this thread waits
+        warmup_seconds = _warm_up_when_admitted(replacement)
+    except Exception as e:
+        # Keep serving the current model rather than retrying a broken version on every
+        # request; it is retried once its files are fixed or it is activated again
+        print(f"Error loading model {version}: {e}")
+        _failed_version = (version, stamp)
+        return
+    with _load_lock:
+        _loaded = replacement
+        if WARMUP_LENGTHS:
+            _status["warmup_seconds"] = warmup_seconds
+            _status["warmup"] = "done"
+
+
+# Start loading a newly activated registry version in the background; requests
+# keep using the current model until the new one is ready
+def refresh_model():
+    global _swap_thread
+    current = load_model()
+    version = registry.active_version()
+    if version is None or version == current.version:
+        return current
+    if _failed_version is not None and _failed_version == (version, registry.version_stamp(version)):
+        return current
+    with _load_lock:
+        if _swap_thread is None or not _swap_thread.is_alive():
+            _swap_thread = threading.Thread(target=_swap_to, args=(version,), daemon=True)
+            _swap_thread.start()
+    return current
+
+
+def max_window_length(tokenizer, model):
+    return min(tokenizer.model_max_length, model.config.max_position_embeddings)
+
+
+# Tokenize texts into overlapping windows and remember which text each window belongs to
+def build_windows(texts, tokenizer, max_length, overlap=WINDOW_OVERLAP):
+    # The overlap must leave room for new tokens in every window
+    overlap = min(overlap, (max_length - tokenizer.num_special_tokens_to_add()) // 2)
+    encoded = tokenizer(
+        texts,
+        truncation=True,
+        max_length=max_length,
+        stride=overlap,
+        return_overflowing_tokens=True,
+    )
+    return encoded["input_ids"], encoded["overflow_to_sample_mapping"]
+
+
+# Group windows of similar length into batches under the token budget, so the
+# windows of one long comment never force padding onto every short comment
+def schedule_batches(windows, max_batch_tokens=MAX_BATCH_TOKENS):
+    order = sorted(range(len(windows)), key=lambda i: len(windows[i]))
+    batches = []
+    current = []
+    longest = 0
+    for i in order:
+        length = len(windows[i])
+        if current and max(longest, length) * (len(current) + 1) > max_batch_tokens:
+            batches.append(current)
+            current = []
+            longest = 0
+        current.append(i)
+        longest = max(longest, length)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def is_multi_label(config):
+    return config.problem_type == "multi_label_classification"
+
+
+# Names of the scored outputs: every label of a multi-label head, or the toxic class of a binary head
+def output_labels(config):
+    if is_multi_label(config):
+        return [config.id2label[i] for i in range(config.num_labels)]
+    return ["toxic"]
+
+
+def label_thresholds(config):
+    configured = getattr(config, "label_thresholds", None) or {}
+    return {
+        name: float(THRESHOLD_OVERRIDES.get(name, configured.get(name, DEFAULT_THRESHOLD)))
+        for name in output_labels(config)
+    }
+
+
+# Per-label scores for a batch of windows, all taken from the same forward pass
+def window_scores(logits, config):
+    if is_multi_label(config):
+        return torch.sigmoid(logits)
+    return F.softmax(logits, dim=1)[:, 1:]
+
+
+def aggregate_scores(scores, aggregation=AGGREGATION):
+    if aggregation == "mean":
+        return sum(scores) / len(scores)
+    if aggregation == "max":
+        return max(scores)
+    raise ValueError(f"Unknown aggregation: {aggregation}")
+
+
+# Classify a list of comments with the served model, returning one result dict per comment
+def predict_texts(texts, aggregation=AGGREGATION, overlap=WINDOW_OVERLAP):
+    with instrumentation.request("api"):
+        results = predict_with(refresh_model(), texts, aggregation, overlap)
+    _status["last_inference_at"] = time.time()
+    metrics.inc("nazar_rows_classified_total", len(results))
+    metrics.inc("nazar_toxic_rows_total", sum(result["label"] == "Toxic" for result in results))
+    return results
+
+
+# Classify a list of comments with a specific loaded model
+def predict_with(loaded, texts, aggregation=AGGREGATION, overlap=WINDOW_OVERLAP):
+    texts = list(texts)
+    if not texts:
+        return []
+
+    tokenizer, model = loaded.tokenizer, loaded.model
+    with instrumentation.stage("tokenize"):
+        windows, owners = build_windows(texts, tokenizer, max_window_length(tokenizer, model), overlap)
+
+    window_rows = [None] * len(windows)
+    for batch in schedule_batches(windows):
+        metrics.observe("nazar_batch_windows", len(batch))
+        with instrumentation.stage("tokenize"):
+            inputs = tokenizer.pad({"input_ids": [windows[i] for i in batch]}, return_tensors="pt")
+        # Each forward pass takes an admission slot, so a single comment never waits
+        # behind more than one batch of a large upload
+        with instrumentation.stage("queue"):
+            token = admission.acquire()
+        try:
+            with instrumentation.stage("forward"):
+                with torch.no_grad():
+                    outputs = model(**inputs)
+        finally:
+            admission.release(token)
+        with instrumentation.stage("postprocess"):
+            scores = window_scores(outputs.logits, model.config)
+            for i, row in zip(batch, scores.tolist()):
+                window_rows[i] = row
+
+    with instrumentation.stage("postprocess"):
+        return _collect_results(loaded, texts, owners, window_rows, aggregation)
+
+
+def _collect_results(loaded, texts, owners, window_rows, aggregation):
+    config = loaded.model.config
+    multi_label = is_multi_label(config)
+    names = output_labels(config)
+    thresholds = label_thresholds(config)
+
+    per_text = [[] for _ in texts]
+    for owner, row in zip(owners, window_rows):
+        per_text[owner].append(row)
+
+    results = []
+    for text, rows in zip(texts, per_text):
+        scores = {
+            name: aggregate_scores([row[k] for row in rows], aggregation)
+            for k, name in enumerate(names)
+        }
+        flagged = [name for name in names if scores[name] > thresholds[name]]
+        results.append({
+            "comment": text,
+            "label": "Toxic" if flagged else "Clean",
+            "confidence": max(scores.values()),
+            "categories": scores if multi_label else {},
+            "flagged": flagged if multi_label else [],
+            "windows": len(rows),
+            "model_version": loaded.version,
+        })
+    return results
@@ -0,0 +1,251 @@
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+import torch
+
+# Thread and core settings written by "python cpu_config.py autotune"
+CONFIG_PATH = os.environ.get("NAZAR_CPU_CONFIG", "cpu_config.json")
+
+# Inference worker processes sharing this machine, and which one this process is. A
+# worker is a whole app process (one Streamlit server); the sessions within it
+# share its threads and cores, so splitting cores means running several processes
+# with distinct NAZAR_WORKER_INDEX values, or pinning each one at launch with taskset.
+WORKERS = int(os.environ.get("NAZAR_WORKERS", "1"))
+WORKER_INDEX = int(os.environ.get("NAZAR_WORKER_INDEX", "0"))
+
+_applied = None
+
+
+# CPUs allowed by the container's CFS quota (cgroup v2 or v1), or None when unlimited
+def cgroup_cpu_limit():
+    try:
+        with open("/sys/fs/cgroup/cpu.max", encoding="utf-8") as f:
+            quota, period = f.read().split()
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", encoding="utf-8") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us", encoding="utf-8") as f:
+            period = int(f.read())
+        return None if quota <= 0 else quota / period
+    except (OSError, ValueError):
+        return None
+
+
+# Cores this process may run on, in order
+def usable_cores():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+# Cores worth of CPU time actually available: the affinity mask capped by the cgroup quota
+def available_cpus():
+    cpus = len(usable_cores())
+    limit = cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, max(1, math.floor(limit)))
+    return cpus
+
+
+# Split the usable cores into one contiguous set per worker
+def split_cores(workers):
+    cores = usable_cores()[:available_cpus()]
+    size = max(1, len(cores) // workers)
+    return [cores[i * size:(i + 1) * size] or cores for i in range(workers)]
+
+
+def default_config(workers=WORKERS):
+    return {
+        "workers": workers,
+        "intra_op_threads": max(1, available_cpus() // workers),
+        "inter_op_threads": 1,
+        "pin": False,
+    }
+
+
+def parse_cores(value):
+    cores = []
+    for part in value.split(","):
+        if "-" in part:
+            first, last = part.split("-")
+            cores.extend(range(int(first), int(last) + 1))
+        elif part.strip():
+            cores.append(int(part))
+    return cores
+
+
+# The config file, else defaults for this machine; NAZAR_INTRA_OP_THREADS,
+# NAZAR_INTER_OP_THREADS and NAZAR_CPU_CORES (e.g. "0-3,8") override either
+def load_config(path=CONFIG_PATH):
+    config = default_config()
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            config.update(json.load(f))
+    if "NAZAR_INTRA_OP_THREADS" in os.environ:
+        config["intra_op_threads"] = int(os.environ["NAZAR_INTRA_OP_THREADS"])
+    if "NAZAR_INTER_OP_THREADS" in os.environ:
+        config["inter_op_threads"] = int(os.environ["NAZAR_INTER_OP_THREADS"])
+    if "NAZAR_CPU_CORES" in os.environ:
+        config["cores"] = parse_cores(os.environ["NAZAR_CPU_CORES"])
+    elif config.get("pin"):
+        config["cores"] = split_cores(config["workers"])[WORKER_INDEX % config["workers"]]
+    return config
+
+
+# Pin every thread of this process. sched_setaffinity(0) alone only covers the calling
+# thread; threads started afterwards inherit the mask of the thread that starts them.
+def pin_process(cores):
+    try:
+        thread_ids = [int(tid) for tid in os.listdir("/proc/self/task")]
+    except OSError:
+        thread_ids = [0]
+    for tid in thread_ids:
+        try:
+            os.sched_setaffinity(tid, cores)
+        except ProcessLookupError:
+            # The thread exited since the listing
+            pass
+
+
+# Apply the thread and core settings to this process, once and before the model loads
+def apply(config=None):
+    global _applied
+    if _applied is not None:
+        return _applied
+    config = config or load_config()
+    if config.get("cores") and hasattr(os, "sched_setaffinity"):
+        pin_process(config["cores"])
+    torch.set_num_threads(config["intra_op_threads"])
+    try:
+        torch.set_num_interop_threads(config["inter_op_threads"])
+    except RuntimeError:
+        # Inter-op threads can only be set before the first parallel work in the process
+        print("Inter-op thread count already fixed for this process; leaving it unchanged")
+    _applied = config
+    return config
+
+
+def applied():
+    return _applied
+
+
+# Run in a subprocess per worker, since inter-op threads are fixed once set; like an
+# app process, it pins all of its threads before the model loads
+def measure(config, iterations, rows, words):
+    from classifier import read_model
+    from benchmarks.bench_inference import time_batches, time_single
+    from benchmarks.corpus import generate
+
+    apply(config)
+    loaded = read_model(None)
+    result = time_single(loaded, generate(iterations, words=words, seed=words), warmup=3)
+    result.update(time_batches(loaded, generate(rows, words=words, seed=words), 32, False, warmup=1))
+    return result
+
+
+def _candidates(workers, pin):
+    per_worker = max(1, available_cpus() // workers)
+    intra = sorted({1, 2, 4, 8, 16, per_worker} & set(range(1, per_worker + 1)))
+    return [
+        {"workers": workers, "intra_op_threads": i, "inter_op_threads": inter, "pin": pin}
+        for i in intra for inter in (1, 2)
+    ]
+
+
+# Benchmark each candidate with every worker running at once; keep the one with the
+# best total throughput whose single-comment p95 stays within `max_p95_ms`
+def autotune(workers, pin, iterations, rows, words, max_p95_ms):
+    results = []
+    for candidate in _candidates(workers, pin):
+        core_sets = split_cores(workers) if pin else [None] * workers
+        processes = []
+        for index, cores in enumerate(core_sets):
+            config = dict(candidate, cores=cores)
+            # stderr goes to a file, so a chatty worker never blocks on a full pipe while
+            # the others are still being measured
+            stderr_file = tempfile.TemporaryFile(mode="w+")
+            processes.append((subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "measure", json.dumps(config),
+                 "--iterations", str(iterations), "--rows", str(rows), "--words", str(words)],
+                stdout=subprocess.PIPE, stderr=stderr_file, text=True,
+                env=dict(os.environ, NAZAR_WORKER_INDEX=str(index)),
+            ), stderr_file))
+        measured = []
+        failures = []
+        for index, (process, stderr_file) in enumerate(processes):
+            stdout = process.communicate()[0]
+            with stderr_file:
+                stderr_file.seek(0)
+                stderr = stderr_file.read()
+            lines = stdout.strip().splitlines()
+            if process.returncode != 0 or not lines:
+                detail = stderr.strip().splitlines()[-1] if stderr.strip() else f"exit code {process.returncode}"
+                failures.append(f"worker {index}: {detail}")
+            else:
+                measured.append(json.loads(lines[-1]))
+        # A candidate is only comparable if every worker finished its measurement
+        if failures:
+            print(f"Skipping {json.dumps(candidate)}: {'; '.join(failures)}", file=sys.stderr)
+            continue
+        summary = dict(candidate)
+        summary["rows_per_second"] = sum(m["rows_per_second"] for m in measured)
+        summary["p95_ms"] = max(m["p95_ms"] for m in measured)
+        print(json.dumps(summary))
+        results.append(summary)
+
+    if not results:
+        raise RuntimeError("Every autotune candidate failed to measure; see the errors above")
+    within = [r for r in results if max_p95_ms is None or r["p95_ms"] <= max_p95_ms] or results
+    best = max(within, key=lambda r: (r["rows_per_second"], -r["p95_ms"]))
+    config = {key: best[key] for key in ("workers", "intra_op_threads", "inter_op_threads", "pin")}
+    config["measured"] = {"rows_per_second": best["rows_per_second"], "p95_ms": best["p95_ms"]}
+    config["created_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU threading configuration for inference workers")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("show", help="Print the detected CPUs and the configuration in effect")
+    tune_parser = commands.add_parser("autotune", help="Benchmark thread settings and write the best one")
+    tune_parser.add_argument("--workers", default=WORKERS, type=int)
+    tune_parser.add_argument("--pin", action="store_true", help="Pin each worker to its own core set")
+    tune_parser.add_argument("--iterations", default=30, type=int)
+    tune_parser.add_argument("--rows", default=256, type=int)
+    tune_parser.add_argument("--words", default=64, type=int)
+    tune_parser.add_argument("--max-p95-ms", default=None, type=float)
+    tune_parser.add_argument("--output", default=CONFIG_PATH)
+    measure_parser = commands.add_parser("measure", help=argparse.SUPPRESS)
+    measure_parser.add_argument("config")
+    measure_parser.add_argument("--iterations", default=30, type=int)
+    measure_parser.add_argument("--rows", default=256, type=int)
+    measure_parser.add_argument("--words", default=64, type=int)
+    args = parser.parse_args()
+
+    if args.command == "show":
+        print(json.dumps({
+            "usable_cores": usable_cores(),
+            "cgroup_cpu_limit": cgroup_cpu_limit(),
+            "available_cpus": available_cpus(),
+            "config": load_config(),
+        }, indent=2))
+    elif args.command == "autotune":
+        config = autotune(args.workers, args.pin, args.iterations, args.rows, args.words, args.max_p95_ms)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=2)
+        print(f"Wrote {args.output}: {config['intra_op_threads']} intra-op / "
+              f"{config['inter_op_threads']} inter-op threads per worker")
+    elif args.command == "measure":
+        print(json.dumps(measure(json.loads(args.config), args.iterations, args.rows, args.words)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import re
+import zlib
+from collections import Counter
+import numpy as np
+from classifier import predict_texts
+import instrumentation
+import metrics
+
+# Character shingle length used to compare comments
+SHINGLE_SIZE = 5
+
+# MinHash signature length, split into LSH bands of NUM_PERM // BANDS rows
+NUM_PERM = 64
+BANDS = 16
+
+# Estimated Jaccard similarity above which two comments count as near duplicates
+SIMILARITY_THRESHOLD = 0.8
+
+# (a * x + b) mod p permutations over the Mersenne prime 2^31 - 1. With x, a and b
+# below p, a * x + b stays under 2^63, so the uint64 arithmetic never wraps.
+_PRIME = np.uint64(2 ** 31 - 1)
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 2 ** 31 - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 2 ** 31 - 1, size=NUM_PERM, dtype=np.uint64)
+
+# Arabic diacritics and tatweel, which raids vary to dodge exact matching
+_ARABIC_MARKS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize(text):
+    text = _ARABIC_MARKS.sub("", str(text).lower())
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    text = normalize(text)
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def minhash(text):
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles(text)), dtype=np.uint64
+    )
+    values = (np.outer(hashes % _PRIME, _PERM_A) + _PERM_B) % _PRIME
+    return values.min(axis=0)
+
+
+# Assign every text to a cluster, returned as the index of the cluster's representative
+def cluster_texts(texts, threshold=SIMILARITY_THRESHOLD):
+    texts = list(texts)
+    parent = list(range(len(texts)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    signatures = [minhash(text) for text in texts]
+    rows = NUM_PERM // BANDS
+    for band in range(BANDS):
+        buckets = {}
+        for i, signature in enumerate(signatures):
+            key = signature[band * rows:(band + 1) * rows].tobytes()
+            first = buckets.setdefault(key, i)
+            if first == i:
+                continue
+            # Verify the candidate pair against the full signature before merging
+            root_i, root_first = find(i), find(first)
+            if root_i != root_first and np.mean(signature == signatures[first]) >= threshold:
+                parent[max(root_i, root_first)] = min(root_i, root_first)
+
+    return [find(i) for i in range(len(texts))]
+
+
+# Classify one representative per near-duplicate cluster and copy its result to the rest
+def predict_deduplicated(texts, predict=predict_texts):
+    texts = list(texts)
+    with instrumentation.stage("dedup"):
+        clusters = cluster_texts(texts)
+    representatives = sorted(set(clusters))
+    predictions = dict(zip(representatives, predict([texts[i] for i in representatives])))
+    sizes = Counter(clusters)
+    metrics.inc("nazar_rows_propagated_total", len(texts) - len(representatives))
+
+    results = []
+    for i, text in enumerate(texts):
+        prediction = dict(predictions[clusters[i]])
+        prediction["comment"] = text
+        prediction["cluster_size"] = sizes[clusters[i]]
+        prediction["propagated"] = clusters[i] != i
+        results.append(prediction)
+    return results
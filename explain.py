@@ -0,0 +1,70 @@
+import html
+import threading
+from collections import OrderedDict
+from classifier import predict_with, refresh_model
+import metrics
+
+# Long comments are occluded in at most this many word spans, bounding the batch size
+MAX_SEGMENTS = 48
+
+# Explanations kept per process, keyed by model version and text
+CACHE_SIZE = 256
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def segment_words(words, max_segments=MAX_SEGMENTS):
+    span = max(1, -(-len(words) // max_segments))
+    return [(start, min(start + span, len(words))) for start in range(0, len(words), span)]
+
+
+# Occlusion attribution: score the comment once and once per removed span, all in a
+# single batched call, and credit each span with how much the toxic score dropped
+def explain_with(loaded, text):
+    words = text.split()
+    segments = segment_words(words)
+    variants = [text] + [" ".join(words[:start] + words[end:]) for start, end in segments]
+    predictions = predict_with(loaded, variants)
+
+    base = predictions[0]["confidence"]
+    attributions = []
+    for (start, end), prediction in zip(segments, predictions[1:]):
+        attributions.append((" ".join(words[start:end]), base - prediction["confidence"]))
+    return {
+        "label": predictions[0]["label"],
+        "confidence": base,
+        "model_version": loaded.version,
+        "attributions": attributions,
+    }
+
+
+def explain(text):
+    loaded = refresh_model()
+    key = (loaded.version, text)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            metrics.inc("nazar_cache_requests_total", cache="explain", result="hit")
+            return _cache[key]
+
+    metrics.inc("nazar_cache_requests_total", cache="explain", result="miss")
+    explanation = explain_with(loaded, text)
+    with _cache_lock:
+        _cache[key] = explanation
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return explanation
+
+
+# Render the comment with each span shaded by how much it pushed the verdict toward toxic
+def render_html(explanation):
+    strongest = max([abs(score) for _, score in explanation["attributions"]] + [1e-6])
+    spans = []
+    for words, score in explanation["attributions"]:
+        weight = max(score, 0.0) / strongest
+        spans.append(
+            f'<span title="{score:+.3f}" style="background-color: rgba(239, 68, 68, {weight:.2f}); '
+            f'padding: 2px 3px; border-radius: 4px;">{html.escape(words)}</span>'
+        )
+    return f'<div dir="auto" style="line-height: 2; font-size: 1.05rem;">{" ".join(spans)}</div>'
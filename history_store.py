@@ -0,0 +1,192 @@
+import os
+import queue
+import sqlite3
+import threading
+from collections import Counter
+from contextlib import contextmanager
+import metrics
+
+# SQLite database holding classification history for every session
+HISTORY_DB = os.environ.get("NAZAR_HISTORY_DB", "history.db")
+
+# Inserts queued while the previous transaction commits share the next one, up to BATCH_SIZE rows
+BATCH_SIZE = 500
+
+# Longest flush() waits for a session's queued inserts before reading anyway
+FLUSH_TIMEOUT_SECONDS = 5.0
+
+COLUMNS = ["timestamp", "comment", "label", "confidence", "model_version"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS classifications (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    comment TEXT NOT NULL,
+    label TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    model_version TEXT
+);
+CREATE INDEX IF NOT EXISTS classifications_session_time ON classifications (session_id, timestamp);
+CREATE INDEX IF NOT EXISTS classifications_session_label ON classifications (session_id, label);
+CREATE INDEX IF NOT EXISTS classifications_time ON classifications (timestamp);
+"""
+
+_queue = queue.Queue()
+# Queued but not yet written inserts per session, for flush()
+_pending = Counter()
+_pending_cond = threading.Condition()
+_writer = None
+_writer_lock = threading.Lock()
+
+# Read connections are shared by all script threads, since Streamlit usually runs
+# each rerun on a new thread; more than a few only contend for the same file
+READ_CONNECTIONS = 4
+_readers = queue.LifoQueue()
+_readers_opened = 0
+_readers_lock = threading.Lock()
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+metrics.register_gauge("nazar_queue_depth", lambda: {(("queue", "history"),): _queue.qsize()})
+
+
+# Connections may move between threads, but each is used by one thread at a time.
+# WAL mode and the schema are set up once per process.
+def connect(path=HISTORY_DB):
+    global _schema_ready
+    connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    connection.execute("PRAGMA synchronous=NORMAL")
+    with _schema_lock:
+        if not _schema_ready:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+            _schema_ready = True
+    return connection
+
+
+# Borrow a read connection from the pool; WAL lets readers run alongside the writer
+@contextmanager
+def _reader():
+    global _readers_opened
+    try:
+        connection = _readers.get_nowait()
+    except queue.Empty:
+        with _readers_lock:
+            open_new = _readers_opened < READ_CONNECTIONS
+            if open_new:
+                _readers_opened += 1
+        if open_new:
+            try:
+                connection = connect()
+            except Exception:
+                with _readers_lock:
+                    _readers_opened -= 1
+                raise
+        else:
+            connection = _readers.get()
+    try:
+        yield connection
+    finally:
+        _readers.put(connection)
+
+
+def _write_loop():
+    connection = None
+    while True:
+        batch = [_queue.get()]
+        # Commit as soon as the queue is empty, so flush() never waits on a timer
+        try:
+            while len(batch) < BATCH_SIZE:
+                batch.append(_queue.get_nowait())
+        except queue.Empty:
+            pass
+        # Any failure, including opening the database, drops this batch but keeps the
+        # writer alive; the connection is opened again for the next batch
+        try:
+            if connection is None:
+                connection = connect()
+            with connection:
+                connection.executemany(
+                    "INSERT INTO classifications (session_id, timestamp, comment, label, confidence, model_version) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    batch,
+                )
+        except Exception as e:
+            print(f"Error writing classification history: {e}")
+            if connection is not None:
+                connection.close()
+            connection = None
+        finally:
+            with _pending_cond:
+                _pending.subtract(row[0] for row in batch)
+                for session_id in {row[0] for row in batch}:
+                    if _pending[session_id] <= 0:
+                        del _pending[session_id]
+                _pending_cond.notify_all()
+
+
+def _ensure_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_write_loop, daemon=True, name="nazar-history")
+            _writer.start()
+
+
+# Queue a classification for the history; returns without touching the database
+def add(session_id, entry):
+    _ensure_writer()
+    with _pending_cond:
+        _pending[session_id] += 1
+    _queue.put((session_id,) + tuple(entry.get(column) for column in COLUMNS))
+
+
+# Wait until a session's queued inserts are written, so a following read sees them.
+# Other sessions' inserts are not waited for; returns False if the timeout ran out.
+def flush(session_id, timeout=FLUSH_TIMEOUT_SECONDS):
+    with _pending_cond:
+        return _pending_cond.wait_for(lambda: not _pending[session_id], timeout)
+
+
+def count(session_id):
+    with _reader() as connection:
+        return connection.execute(
+            "SELECT COUNT(*) FROM classifications WHERE session_id = ?", (session_id,)
+        ).fetchone()[0]
+
+
+# One page of a session's history, newest first
+def page(session_id, page_number=1, page_size=50):
+    with _reader() as connection:
+        rows = connection.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM classifications WHERE session_id = ? "
+            "ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+            (session_id, page_size, (page_number - 1) * page_size),
+        ).fetchall()
+    return [dict(zip(COLUMNS, row)) for row in rows]
+
+
+def all_rows(session_id):
+    with _reader() as connection:
+        rows = connection.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM classifications WHERE session_id = ? ORDER BY timestamp, id",
+            (session_id,),
+        ).fetchall()
+    return [dict(zip(COLUMNS, row)) for row in rows]
+
+
+# Counts per label, confidence bin and minute, for seeding running aggregates
+def grouped_counts(session_id, bins=10):
+    with _reader() as connection:
+        return connection.execute(
+            "SELECT label, MIN(CAST(confidence * ? AS INTEGER), ? - 1), substr(timestamp, 1, 16), COUNT(*) "
+            "FROM classifications WHERE session_id = ? GROUP BY 1, 2, 3 ORDER BY 3",
+            (bins, bins, session_id),
+        ).fetchall()
+
+
+def clear(session_id):
+    flush(session_id)
+    with _reader() as connection, connection:
+        connection.execute("DELETE FROM classifications WHERE session_id = ?", (session_id,))
@@ -0,0 +1,126 @@
+import bisect
+import contextvars
+import json
+import threading
+import time
+from contextlib import contextmanager
+import profiler
+
+# Histogram bucket upper bounds in seconds, growing by 25% from 50 microseconds to ~2 minutes
+BUCKET_BOUNDS = [0.00005 * 1.25 ** i for i in range(67)]
+
+PERCENTILES = (0.5, 0.95, 0.99)
+
+
+# Fixed-bucket latency histogram; memory stays constant however many samples arrive
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return min(BUCKET_BOUNDS[i], self.max) if i < len(BUCKET_BOUNDS) else self.max
+        return self.max
+
+    def summary(self):
+        result = {"count": self.count, "mean": self.total / self.count if self.count else 0.0, "max": self.max}
+        for q in PERCENTILES:
+            result[f"p{int(q * 100)}"] = self.percentile(q)
+        return result
+
+
+class _Request:
+    def __init__(self, entry_point):
+        self.entry_point = entry_point
+        self.stages = {}
+
+
+_histograms = {}
+_lock = threading.Lock()
+_current = contextvars.ContextVar("nazar_request", default=None)
+
+
+def observe(entry_point, stage_name, seconds):
+    with _lock:
+        histogram = _histograms.get((entry_point, stage_name))
+        if histogram is None:
+            histogram = _histograms[(entry_point, stage_name)] = Histogram()
+        histogram.observe(seconds)
+
+
+# Time one request from an entry point ("single", "csv", "api"). Stage times inside it
+# are summed per request and recorded when it ends, along with the "total" stage.
+# A request opened inside another one is folded into the outer request. Requests
+# slower than profiler.SLOW_SECONDS also get their CPU profile saved.
+@contextmanager
+def request(entry_point):
+    if _current.get() is not None:
+        yield _current.get()
+        return
+    current = _Request(entry_point)
+    token = _current.set(current)
+    profile = profiler.start()
+    start = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current.stages["total"] = time.perf_counter() - start
+        _current.reset(token)
+        for stage_name, seconds in current.stages.items():
+            observe(entry_point, stage_name, seconds)
+        profiler.finish(profile, current.stages["total"], {"entry_point": entry_point, "stages": current.stages})
+
+
+# Time a stage of the current request; does nothing outside a request
+@contextmanager
+def stage(name):
+    current = _current.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if current is not None:
+            current.stages[name] = current.stages.get(name, 0.0) + time.perf_counter() - start
+
+
+def snapshot():
+    with _lock:
+        items = sorted(_histograms.items())
+        return {f"{entry_point}/{stage_name}": histogram.summary() for (entry_point, stage_name), histogram in items}
+
+
+# Copies of the raw histograms, for exporters that need the buckets
+def histogram_items():
+    with _lock:
+        items = []
+        for key, histogram in sorted(_histograms.items()):
+            copy = Histogram()
+            copy.counts = list(histogram.counts)
+            copy.count, copy.total, copy.max = histogram.count, histogram.total, histogram.max
+            items.append((key, copy))
+        return items
+
+
+def dump(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f, indent=2)
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
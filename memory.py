@@ -0,0 +1,189 @@
+import hashlib
+import os
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+import metrics
+
+# Bytes of uploaded results kept in memory per session; the oldest files go first
+MAX_RESULTS_BYTES = int(os.environ.get("NAZAR_MAX_RESULTS_BYTES", str(256 * 1024 * 1024)))
+
+# Spilled data is written here; set it empty to evict instead of spilling
+SPILL_DIR = os.environ.get("NAZAR_SPILL_DIR", "spill")
+
+# Sessions not seen for this long drop out of the process-wide accounting, and their
+# spill files are deleted
+SESSION_TTL_SECONDS = 3600
+
+# How often the spill directory is swept for files of sessions that are gone
+SPILL_SWEEP_SECONDS = 300
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_last_sweep = 0.0
+_last_snapshot = None
+
+
+# Session ids are 12 random hex digits; anything else arriving from a URL is ignored
+SESSION_ID_PATTERN = re.compile(r"[0-9a-f]{12}")
+
+
+def valid_session_id(value):
+    return isinstance(value, str) and SESSION_ID_PATTERN.fullmatch(value) is not None
+
+
+def session_id(session_state):
+    if "session_id" not in session_state:
+        session_state["session_id"] = uuid.uuid4().hex[:12]
+    return session_state["session_id"]
+
+
+def _session_hash(sid):
+    return hashlib.sha256(sid.encode("utf-8")).hexdigest()[:16]
+
+
+# Spill files are named after a hash of the session id, never the id itself
+def _spill_path(session_state, name):
+    safe_name = re.sub(r"[^\w.-]", "_", name)
+    return os.path.join(SPILL_DIR, f"{_session_hash(session_id(session_state))}-{safe_name}")
+
+
+def dataframe_bytes(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+# Keep an uploaded result and remember its size, so accounting never rescans it. The
+# cap is applied here too, since later interactions may only rerun a fragment.
+def store_result(session_state, name, df):
+    results = session_state["uploaded_results"]
+    # Re-inserted so a replaced result counts as the newest
+    results.pop(name, None)
+    results[name] = df
+    session_state.get("spilled_results", {}).pop(name, None)
+    session_state.setdefault("result_bytes", {})[name] = dataframe_bytes(df)
+    _spill_results(session_state)
+
+
+def _spill_results(session_state):
+    results = session_state["uploaded_results"]
+    sizes = session_state.setdefault("result_bytes", {})
+    spilled = session_state.setdefault("spilled_results", {})
+    # Always keep the newest result in memory
+    while len(results) > 1 and sum(sizes.get(name, 0) for name in results) > MAX_RESULTS_BYTES:
+        name = next(iter(results))
+        df = results.pop(name)
+        sizes.pop(name, None)
+        if SPILL_DIR:
+            os.makedirs(SPILL_DIR, exist_ok=True)
+            path = _spill_path(session_state, name) + ".csv.gz"
+            df.to_csv(path, index=False, compression="gzip")
+            spilled[name] = path
+
+
+# Delete spill files of sessions that are no longer tracked, once they are older than
+# the session TTL; this also covers files left behind by an earlier process
+def _sweep_spill(now):
+    global _last_sweep
+    if not SPILL_DIR or now - _last_sweep < SPILL_SWEEP_SECONDS or not os.path.isdir(SPILL_DIR):
+        return
+    _last_sweep = now
+    active = {_session_hash(sid) for sid in _sessions}
+    for file_name in os.listdir(SPILL_DIR):
+        path = os.path.join(SPILL_DIR, file_name)
+        try:
+            if file_name.split("-", 1)[0] not in active and now - os.path.getmtime(path) > SESSION_TTL_SECONDS:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+# Apply the caps to one session and update the process-wide accounting; call once per rerun
+def enforce_caps(session_state):
+    _spill_results(session_state)
+    # A session idle past the TTL may have had its spill files swept
+    spilled = session_state.get("spilled_results", {})
+    for name, path in list(spilled.items()):
+        if not os.path.exists(path):
+            del spilled[name]
+    usage = {
+        "results_files": len(session_state["uploaded_results"]),
+        "results_bytes": sum(session_state.get("result_bytes", {}).values()),
+        "spilled_results": len(session_state.get("spilled_results", {})),
+    }
+    now = time.time()
+    with _sessions_lock:
+        _sessions[session_id(session_state)] = (now, usage["results_bytes"])
+        for sid, (seen, _) in list(_sessions.items()):
+            if now - seen > SESSION_TTL_SECONDS:
+                del _sessions[sid]
+        _sweep_spill(now)
+    return usage
+
+
+# A spilled result as stored (gzipped CSV), so serving it never decompresses it
+def spilled_result_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+# Remove everything a session has spilled to disk, e.g. on "Reset Session"
+def clear_spill(session_state):
+    for path in session_state.get("spilled_results", {}).values():
+        if os.path.exists(path):
+            os.remove(path)
+    session_state["spilled_results"] = {}
+    session_state["result_bytes"] = {}
+
+
+def process_usage():
+    with _sessions_lock:
+        session_bytes = sum(size for _, size in _sessions.values())
+        sessions = len(_sessions)
+    return {"resident_bytes": metrics.resident_bytes(), "sessions": sessions, "session_bytes": session_bytes}
+
+
+metrics.register_gauge("nazar_session_bytes", lambda: {(): process_usage()["session_bytes"]})
+metrics.register_gauge("nazar_sessions", lambda: {(): process_usage()["sessions"]})
+
+
+def tracing():
+    return tracemalloc.is_tracing()
+
+
+# Allocation tracing slows every allocation in the process, so it only runs between
+# an explicit start and stop from the admin panel
+def start_tracing(frames=10):
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def stop_tracing():
+    global _last_snapshot
+    _last_snapshot = None
+    tracemalloc.stop()
+
+
+# Top allocation sites, and growth since the previous call, from a tracemalloc snapshot.
+# Only covers allocations made since start_tracing(); returns None while tracing is off.
+def tracemalloc_report(limit=15):
+    global _last_snapshot
+    if not tracemalloc.is_tracing():
+        return None
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ])
+    top = [
+        {"location": str(stat.traceback[0]), "size_kb": stat.size / 1024, "count": stat.count}
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
+    growth = []
+    if _last_snapshot is not None:
+        growth = [
+            {"location": str(stat.traceback[0]), "size_diff_kb": stat.size_diff / 1024, "count_diff": stat.count_diff}
+            for stat in snapshot.compare_to(_last_snapshot, "lineno")[:limit]
+        ]
+    _last_snapshot = snapshot
+    return {"top": top, "growth": growth}
@@ -0,0 +1,226 @@
+import json
+import os
+import resource
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import instrumentation
+
+# Port of the local /metrics endpoint; 0 disables it
+METRICS_PORT = int(os.environ.get("NAZAR_METRICS_PORT", "9108"))
+METRICS_HOST = os.environ.get("NAZAR_METRICS_HOST", "127.0.0.1")
+
+HELP = {
+    "nazar_requests_total": "Classification requests by entry point",
+    "nazar_rows_classified_total": "Comments scored by the model",
+    "nazar_toxic_rows_total": "Scored comments labelled toxic",
+    "nazar_toxic_ratio": "Share of scored comments labelled toxic",
+    "nazar_rows_propagated_total": "Comments that reused a near-duplicate's result",
+    "nazar_cache_requests_total": "Cache lookups by cache and result",
+    "nazar_cache_hit_ratio": "Cache hit ratio by cache",
+    "nazar_batch_windows": "Token windows per forward pass",
+    "nazar_queue_depth": "Work waiting in a queue",
+    "nazar_inference_running": "Forward passes currently holding an admission slot",
+    "nazar_admission_rejections_total": "Forward passes rejected by admission control by reason and priority",
+    "nazar_capture_dropped_total": "Captured requests dropped before reaching disk",
+    "nazar_model_load_seconds": "Time taken to load the served model",
+    "nazar_shadow_requests": "Requests compared against the shadow candidate by this process",
+    "nazar_shadow_rows": "Comments compared against the shadow candidate by this process",
+    "nazar_shadow_dropped": "Shadow comparisons dropped because the candidate was behind",
+    "nazar_shadow_errors": "Shadow comparisons that failed",
+    "nazar_shadow_agreement_rate": "Share of compared comments where the candidate agrees with the served model",
+    "nazar_shadow_confidence_delta": "Mean candidate minus served model confidence",
+    "nazar_shadow_candidate_seconds": "Mean candidate inference time per compared request",
+    "nazar_shadow_primary_seconds": "Mean served model inference time per compared request",
+    "nazar_ready": "1 once the served model is loaded and warmed up",
+    "nazar_process_resident_bytes": "Resident memory of this process",
+    "nazar_session_bytes": "Estimated bytes held in session history and uploaded results",
+    "nazar_sessions": "Sessions seen within the memory accounting window",
+    "nazar_stage_duration_seconds": "Latency of each classification stage by entry point",
+}
+
+BATCH_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_histograms = {}
+_gauge_callbacks = []
+_health_callback = None
+_server = None
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    with _lock:
+        key = _key(name, labels)
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name, value, **labels):
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+# Register a function returning {labels tuple: value} that is read at scrape time
+def register_gauge(name, callback):
+    with _lock:
+        _gauge_callbacks.append((name, callback))
+
+
+# Register a function returning a JSON-able dict with a "ready" flag, served at /health and /ready
+def register_health(callback):
+    global _health_callback
+    _health_callback = callback
+
+
+def health():
+    return _health_callback() if _health_callback is not None else {"ready": False}
+
+
+def observe(name, value, buckets=BATCH_BUCKETS, **labels):
+    with _lock:
+        key = _key(name, labels)
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = {"buckets": list(buckets), "counts": [0] * len(buckets), "count": 0, "sum": 0.0}
+        for i, bound in enumerate(histogram["buckets"]):
+            if value <= bound:
+                histogram["counts"][i] += 1
+        histogram["count"] += 1
+        histogram["sum"] += value
+
+
+def counter_value(name, **labels):
+    with _lock:
+        return _counters.get(_key(name, labels), 0)
+
+
+def resident_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # ru_maxrss is the peak, in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = [(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in labels]
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _derived_gauges():
+    gauges = {}
+    classified = counter_value("nazar_rows_classified_total")
+    if classified:
+        gauges[_key("nazar_toxic_ratio", {})] = counter_value("nazar_toxic_rows_total") / classified
+    with _lock:
+        cache_counts = {}
+        for (name, labels), value in _counters.items():
+            if name == "nazar_cache_requests_total":
+                label_map = dict(labels)
+                hits, total = cache_counts.get(label_map["cache"], (0, 0))
+                cache_counts[label_map["cache"]] = (hits + (value if label_map["result"] == "hit" else 0), total + value)
+    for cache, (hits, total) in cache_counts.items():
+        gauges[_key("nazar_cache_hit_ratio", {"cache": cache})] = hits / total
+    gauges[_key("nazar_process_resident_bytes", {})] = resident_bytes()
+    return gauges
+
+
+# Render every metric in the Prometheus text exposition format
+def render():
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        histograms = {key: dict(value, counts=list(value["counts"])) for key, value in _histograms.items()}
+        callbacks = list(_gauge_callbacks)
+    gauges.update(_derived_gauges())
+    for name, callback in callbacks:
+        for labels, value in callback().items():
+            gauges[(name, labels)] = value
+
+    families = {}
+    for (name, labels), value in counters.items():
+        families.setdefault((name, "counter"), []).append(f"{name}{_format_labels(labels)} {value}")
+    for (name, labels), value in gauges.items():
+        families.setdefault((name, "gauge"), []).append(f"{name}{_format_labels(labels)} {value}")
+    for (name, labels), histogram in histograms.items():
+        lines = families.setdefault((name, "histogram"), [])
+        for bound, count in zip(histogram["buckets"], histogram["counts"]):
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {count}")
+        lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram['count']}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {histogram['sum']}")
+        lines.append(f"{name}_count{_format_labels(labels)} {histogram['count']}")
+
+    # Request counts and stage latencies come straight from the instrumentation histograms
+    request_lines = families.setdefault(("nazar_requests_total", "counter"), [])
+    stage_lines = families.setdefault(("nazar_stage_duration_seconds", "histogram"), [])
+    for (entry_point, stage_name), histogram in instrumentation.histogram_items():
+        labels = (("entry_point", entry_point), ("stage", stage_name))
+        if stage_name == "total":
+            request_lines.append(f"nazar_requests_total{_format_labels((('entry_point', entry_point),))} {histogram.count}")
+        cumulative = 0
+        for bound, count in zip(instrumentation.BUCKET_BOUNDS, histogram.counts):
+            cumulative += count
+            stage_lines.append(f"nazar_stage_duration_seconds_bucket{_format_labels(labels + (('le', f'{bound:.6g}'),))} {cumulative}")
+        stage_lines.append(f"nazar_stage_duration_seconds_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+        stage_lines.append(f"nazar_stage_duration_seconds_sum{_format_labels(labels)} {histogram.total}")
+        stage_lines.append(f"nazar_stage_duration_seconds_count{_format_labels(labels)} {histogram.count}")
+
+    output = []
+    for (name, kind), lines in sorted(families.items()):
+        if not lines:
+            continue
+        output.append(f"# HELP {name} {HELP.get(name, name)}")
+        output.append(f"# TYPE {name} {kind}")
+        output.extend(lines if kind == "histogram" else sorted(lines))
+    return "\n".join(output) + "\n"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/metrics":
+            body = render().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+            code = 200
+        elif path in ("/health", "/ready"):
+            # /health answers while the process is up; /ready only once it can take traffic
+            state = health()
+            body = json.dumps(state).encode("utf-8")
+            content_type = "application/json"
+            code = 200 if path == "/health" or state["ready"] else 503
+        else:
+            self.send_error(404)
+            return
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Serve /metrics, /health and /ready from a daemon thread; safe to call on every Streamlit rerun
+def start_server(port=METRICS_PORT, host=METRICS_HOST):
+    global _server
+    with _lock:
+        if _server is not None or not port:
+            return _server
+        try:
+            _server = ThreadingHTTPServer((host, port), MetricsHandler)
+        except OSError as e:
+            # Another worker on this host already owns the port
+            print(f"Metrics endpoint not started on port {port}: {e}")
+            _server = False
+            return _server
+    threading.Thread(target=_server.serve_forever, daemon=True, name="nazar-metrics").start()
+    return _server
+
@@ -1,24 +1,44 @@
 import streamlit as st
 from PIL import Image, ImageDraw
+import base64
 import io
+from functools import lru_cache
 
-# Create a simple red eye logo
-def create_eye_logo():
-    # Create a new image with white background
-    img = Image.new('RGBA', (200, 200), (255, 255, 255, 0))
+EYE_COLOR = (230, 57, 70)
+
+# Create a simple red eye logo, drawn once per size and format
+@lru_cache(maxsize=16)
+def create_eye_logo(size=200, fmt="PNG"):
+    # Create a new image with transparent background
+    img = Image.new('RGBA', (size, size), (255, 255, 255, 0))
     draw = ImageDraw.Draw(img)
-    
+    scale = size / 200
+
     # Draw the eye outline (red circle)
-    draw.ellipse((50, 50, 150, 150), outline=(230, 57, 70), width=5)
-    
+    draw.ellipse([c * scale for c in (50, 50, 150, 150)], outline=EYE_COLOR, width=max(1, round(5 * scale)))
+
     # Draw the pupil (filled red circle)
-    draw.ellipse((85, 85, 115, 115), fill=(230, 57, 70))
-    
+    draw.ellipse([c * scale for c in (85, 85, 115, 115)], fill=EYE_COLOR)
+
     # Save to a bytes buffer
     buf = io.BytesIO()
-    img.save(buf, format='PNG')
+    img.save(buf, format=fmt)
     return buf.getvalue()
 
+# The same logo as a few hundred bytes of SVG, sharp at any display size
+def create_eye_svg():
+    color = "#{:02x}{:02x}{:02x}".format(*EYE_COLOR)
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 200 200">'
+        f'<circle cx="100" cy="100" r="47.5" fill="none" stroke="{color}" stroke-width="5"/>'
+        f'<circle cx="100" cy="100" r="15" fill="{color}"/>'
+        '</svg>'
+    )
+
+@lru_cache(maxsize=1)
+def svg_data_uri():
+    return "data:image/svg+xml;base64," + base64.b64encode(create_eye_svg().encode("utf-8")).decode("utf-8")
+
 # Function to get the logo as bytes
-def get_logo_bytes():
-    return create_eye_logo()
+def get_logo_bytes(size=200, fmt="PNG"):
+    return create_eye_logo(size, fmt.upper())
@@ -0,0 +1,139 @@
+import cProfile
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+# Requests slower than this many seconds have their profile saved; 0 disables profiling
+SLOW_SECONDS = float(os.environ.get("NAZAR_SLOW_REQUEST_SECONDS", "2.0"))
+
+# "sample" walks the request thread's stack every SAMPLE_INTERVAL seconds, which costs
+# next to nothing when the request turns out fast; "cprofile" traces every call instead
+PROFILE_MODE = os.environ.get("NAZAR_PROFILE_MODE", "sample")
+SAMPLE_INTERVAL = 0.005
+
+PROFILE_DIR = os.environ.get("NAZAR_PROFILE_DIR", "profiles")
+MAX_PROFILES = int(os.environ.get("NAZAR_MAX_PROFILES", "50"))
+
+_active = {}
+_active_changed = threading.Condition()
+_sampler = None
+
+
+def enabled():
+    return SLOW_SECONDS > 0
+
+
+def _stack(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _sample_loop():
+    while True:
+        # Samples are taken under the lock so finish() never reads a profile mid-update
+        with _active_changed:
+            while not _active:
+                _active_changed.wait()
+            frames = sys._current_frames()
+            for thread_id, samples in _active.items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    samples[_stack(frame)] += 1
+        time.sleep(SAMPLE_INTERVAL)
+
+
+def _ensure_sampler():
+    global _sampler
+    with _active_changed:
+        if _sampler is None:
+            _sampler = threading.Thread(target=_sample_loop, daemon=True, name="nazar-profiler")
+            _sampler.start()
+
+
+# Start profiling the calling thread; returns a handle for finish()
+def start():
+    if not enabled():
+        return None
+    if PROFILE_MODE == "cprofile":
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already active in this process
+            return None
+        return ("cprofile", profile)
+    _ensure_sampler()
+    samples = Counter()
+    with _active_changed:
+        _active[threading.get_ident()] = samples
+        _active_changed.notify()
+    return ("sample", samples)
+
+
+# Stop profiling and keep the profile only if the request was slow
+def finish(handle, seconds, metadata):
+    if handle is None:
+        return None
+    mode, data = handle
+    if mode == "cprofile":
+        data.disable()
+    else:
+        with _active_changed:
+            _active.pop(threading.get_ident(), None)
+    if seconds < SLOW_SECONDS:
+        return None
+    try:
+        return _save(mode, data, seconds, metadata)
+    except OSError as e:
+        print(f"Error saving slow request profile: {e}")
+        return None
+
+
+def _save(mode, data, seconds, metadata):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    now = datetime.now()
+    name = f"{now.strftime('%Y%m%d-%H%M%S-%f')}-{metadata.get('entry_point', 'request')}-{int(seconds * 1000)}ms"
+    base = os.path.join(PROFILE_DIR, name)
+
+    if mode == "cprofile":
+        profile_path = base + ".prof"
+        data.dump_stats(profile_path)
+    else:
+        # Collapsed stacks, readable by flamegraph.pl and speedscope
+        profile_path = base + ".collapsed"
+        with open(profile_path, "w", encoding="utf-8") as f:
+            for stack, count in data.most_common():
+                f.write(f"{stack} {count}\n")
+
+    record = dict(metadata)
+    record.update({
+        "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
+        "seconds": seconds,
+        "mode": mode,
+        "profile": os.path.basename(profile_path),
+    })
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2)
+
+    for old in sorted(glob.glob(os.path.join(PROFILE_DIR, "*.json")))[:-MAX_PROFILES]:
+        for path in glob.glob(os.path.splitext(old)[0] + ".*"):
+            os.remove(path)
+    return profile_path
+
+
+# Metadata of the most recent slow-request profiles, newest first
+def recent_profiles(limit=20):
+    records = []
+    for path in sorted(glob.glob(os.path.join(PROFILE_DIR, "*.json")), reverse=True)[:limit]:
+        with open(path, encoding="utf-8") as f:
+            records.append(json.load(f))
+    return records
@@ -0,0 +1,143 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+
+# Versioned model directories live under REGISTRY_DIR/<version>, and the
+# ACTIVE file names the version the app should serve
+REGISTRY_DIR = os.environ.get("NAZAR_REGISTRY_DIR", "./models")
+ACTIVE_FILE = "ACTIVE"
+METADATA_FILE = "metadata.json"
+
+
+def version_path(version):
+    return os.path.join(REGISTRY_DIR, version)
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def directory_checksums(path):
+    checksums = {}
+    for name in sorted(os.listdir(path)):
+        full_path = os.path.join(path, name)
+        if name != METADATA_FILE and os.path.isfile(full_path):
+            checksums[name] = file_checksum(full_path)
+    return checksums
+
+
+def read_metadata(version):
+    with open(os.path.join(version_path(version), METADATA_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def list_versions():
+    if not os.path.isdir(REGISTRY_DIR):
+        return []
+    return sorted(
+        name for name in os.listdir(REGISTRY_DIR)
+        if os.path.isfile(os.path.join(REGISTRY_DIR, name, METADATA_FILE))
+    )
+
+
+# Copy a saved model directory into the registry and record its checksums
+def register(source_dir, version, description=""):
+    target = version_path(version)
+    if os.path.exists(target):
+        raise ValueError(f"Model version {version} is already registered")
+
+    staging = target + ".tmp"
+    shutil.copytree(source_dir, staging)
+    metadata = {
+        "version": version,
+        "source": os.path.abspath(source_dir),
+        "description": description,
+        "registered_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "checksums": directory_checksums(staging),
+    }
+    with open(os.path.join(staging, METADATA_FILE), "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(staging, target)
+    return metadata
+
+
+# Raise if any artifact of a version no longer matches its recorded checksum
+def verify(version):
+    expected = read_metadata(version)["checksums"]
+    actual = directory_checksums(version_path(version))
+    if actual != expected:
+        changed = sorted(name for name in set(expected) | set(actual) if expected.get(name) != actual.get(name))
+        raise ValueError(f"Checksum mismatch for model {version}: {', '.join(changed)}")
+
+
+# Mark a version active; the file is replaced atomically so readers never see a partial write
+def activate(version):
+    verify(version)
+    tmp_path = os.path.join(REGISTRY_DIR, ACTIVE_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(REGISTRY_DIR, ACTIVE_FILE))
+
+
+# Latest modification time of a version's files and the ACTIVE file; changes when a
+# version is repaired or activated again, without hashing every artifact
+def version_stamp(version):
+    paths = [os.path.join(REGISTRY_DIR, ACTIVE_FILE)]
+    try:
+        paths += [os.path.join(version_path(version), name) for name in os.listdir(version_path(version))]
+        return max(os.path.getmtime(path) for path in paths)
+    except OSError:
+        return None
+
+
+def active_version():
+    try:
+        with open(os.path.join(REGISTRY_DIR, ACTIVE_FILE), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the local Nazar model registry")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List registered model versions")
+    register_parser = commands.add_parser("register", help="Copy a saved model into the registry")
+    register_parser.add_argument("source_dir")
+    register_parser.add_argument("version")
+    register_parser.add_argument("--description", default="")
+    register_parser.add_argument("--activate", action="store_true")
+    activate_parser = commands.add_parser("activate", help="Mark a registered version active")
+    activate_parser.add_argument("version")
+    verify_parser = commands.add_parser("verify", help="Check a version against its checksums")
+    verify_parser.add_argument("version")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        active = active_version()
+        for version in list_versions():
+            metadata = read_metadata(version)
+            marker = "*" if version == active else " "
+            print(f"{marker} {version}  {metadata['registered_at']}  {metadata['description']}")
+    elif args.command == "register":
+        register(args.source_dir, args.version, args.description)
+        if args.activate:
+            activate(args.version)
+        print(f"Registered model {args.version}")
+    elif args.command == "activate":
+        activate(args.version)
+        print(f"Activated model {args.version}")
+    elif args.command == "verify":
+        verify(args.version)
+        print(f"Model {args.version} matches its checksums")
+
+
+if __name__ == "__main__":
+    main()
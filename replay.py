@@ -0,0 +1,144 @@
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from classifier import load_model, predict_texts
+from dedup import predict_deduplicated
+import instrumentation
+import admission
+
+# Traffic records are JSON lines such as
+#   {"timestamp": "2025-04-08T12:00:00.250", "entry_point": "single", "text": "..."}
+#   {"timestamp": "2025-04-08T12:00:01.000", "entry_point": "csv", "texts": ["...", "..."]}
+# Records captured without their text (only a hash) cannot be replayed and are skipped.
+
+
+def load_records(path):
+    records = []
+    skipped = 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            texts = record.get("texts") or ([record["text"]] if "text" in record else None)
+            if not texts or "timestamp" not in record:
+                skipped += 1
+                continue
+            records.append({
+                "offset": datetime.fromisoformat(record["timestamp"]).timestamp(),
+                "entry_point": record.get("entry_point", "single"),
+                "texts": texts,
+            })
+    records.sort(key=lambda r: r["offset"])
+    if records:
+        start = records[0]["offset"]
+        for record in records:
+            record["offset"] -= start
+    return records, skipped
+
+
+# Scheduled like the app: single comments at interactive priority, everything else as batch work
+def classify(record):
+    with instrumentation.request(record["entry_point"]):
+        if record["entry_point"] == "csv":
+            predict_deduplicated(record["texts"])
+        elif record["entry_point"] == "single":
+            with admission.priority(admission.INTERACTIVE):
+                predict_texts(record["texts"])
+        else:
+            predict_texts(record["texts"])
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# Replay records at their recorded spacing divided by `speed` (0 replays back to back).
+# Paced runs measure latency from each request's scheduled time, so queueing behind a
+# full worker pool counts against it instead of silently slowing the schedule. Back to
+# back, every request would be "scheduled" at the start, so latency is measured from
+# when a worker picks the request up.
+def replay(records, speed=1.0, concurrency=4):
+    lock = threading.Lock()
+    latencies = []
+    errors = []
+    rows = sum(len(r["texts"]) for r in records)
+
+    def run(record, scheduled):
+        if scheduled is None:
+            scheduled = time.perf_counter()
+        try:
+            classify(record)
+        except Exception as e:
+            with lock:
+                errors.append(f"{type(e).__name__}: {e}")
+            return
+        with lock:
+            latencies.append(time.perf_counter() - scheduled)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for record in records:
+            if not speed:
+                pool.submit(run, record, None)
+                continue
+            scheduled = start + record["offset"] / speed
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(run, record, scheduled)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests": len(records),
+        "rows": rows,
+        "errors": len(errors),
+        "error_rate": len(errors) / len(records) if records else 0.0,
+        "first_errors": errors[:5],
+        "seconds": elapsed,
+        "requests_per_second": len(records) / elapsed if elapsed else 0.0,
+        "rows_per_second": rows / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 0.5) * 1000,
+            "p95": percentile(latencies, 0.95) * 1000,
+            "p99": percentile(latencies, 0.99) * 1000,
+            "max": max(latencies, default=0.0) * 1000,
+        },
+        "stages": instrumentation.snapshot(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded classification traffic against the classifier")
+    parser.add_argument("traffic", help="JSONL file of recorded requests")
+    parser.add_argument("--speed", default=1.0, type=float,
+                        help="Replay rate multiplier; 2 replays twice as fast, 0 as fast as possible")
+    parser.add_argument("--concurrency", default=4, type=int)
+    parser.add_argument("--limit", default=None, type=int, help="Replay only the first N records")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    args = parser.parse_args()
+
+    records, skipped = load_records(args.traffic)
+    if args.limit:
+        records = records[:args.limit]
+    if skipped:
+        print(f"Skipped {skipped} records without replayable text")
+
+    # Load the model up front so its load time is not charged to the first requests
+    load_model()
+    report = replay(records, args.speed, args.concurrency)
+    report["skipped"] = skipped
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import os
+import sys
+import threading
+from streamlit.web import cli
+from classifier import load_model
+import metrics
+
+# Start the app with "python serve.py [streamlit run options]" instead of "streamlit run app.py".
+#
+# Streamlit only runs app.py when a browser session connects, so under plain
+# "streamlit run" nothing listens on /metrics or /ready and no model is loaded until
+# the first visitor arrives and pays for both. This launcher starts the metrics
+# server and loads and warms up the model in the background at process start, then
+# hands over to Streamlit in the same process; app.py finds both already running.
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+
+def _load():
+    try:
+        load_model()
+    except Exception as e:
+        # /ready stays 503; the first session retries the load and shows the error
+        print(f"Loading the model at startup failed: {e}")
+
+
+def main():
+    metrics.start_server()
+    threading.Thread(target=_load, daemon=True, name="nazar-startup").start()
+    sys.argv = ["streamlit", "run", APP_PATH, *sys.argv[1:]]
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from classifier import predict_with, read_model
+import metrics
+import admission
+import registry
+
+# Registry version of the candidate model; shadow mode is off when unset
+SHADOW_VERSION = os.environ.get("NAZAR_SHADOW_VERSION")
+
+# Fraction of requests that are also scored by the candidate
+SHADOW_FRACTION = float(os.environ.get("NAZAR_SHADOW_FRACTION", "0.1"))
+
+# Comparisons waiting for the candidate beyond this are dropped instead of queued
+MAX_PENDING = int(os.environ.get("NAZAR_SHADOW_MAX_PENDING", "16"))
+
+SHADOW_LOG = os.environ.get("NAZAR_SHADOW_LOG", "shadow_log.jsonl")
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nazar-shadow")
+_lock = threading.Lock()
+_candidate = None
+# (version, registry.version_stamp) of the candidate when it last failed to load
+_failed_version = None
+_pending = 0
+_stats = {
+    "requests": 0,
+    "rows": 0,
+    "agreements": 0,
+    "dropped": 0,
+    "errors": 0,
+    "primary_seconds": 0.0,
+    "candidate_seconds": 0.0,
+    "confidence_delta_sum": 0.0,
+}
+
+
+metrics.register_gauge("nazar_queue_depth", lambda: {(("queue", "shadow"),): _pending})
+
+
+def enabled():
+    return bool(SHADOW_VERSION) and SHADOW_FRACTION > 0
+
+
+def _compare(texts, primary_results, primary_seconds, entry_point):
+    global _candidate, _failed_version, _pending
+    try:
+        # The candidate is loaded lazily on the shadow thread, never on the request path
+        if _candidate is None:
+            # A candidate that failed to load is not verified again on every sampled request;
+            # it is retried once its files are fixed
+            stamp = registry.version_stamp(SHADOW_VERSION)
+            if _failed_version == (SHADOW_VERSION, stamp):
+                with _lock:
+                    _stats["errors"] += 1
+                return
+            try:
+                _candidate = read_model(SHADOW_VERSION)
+            except Exception:
+                _failed_version = (SHADOW_VERSION, stamp)
+                raise
+        start = time.perf_counter()
+        # Shadow scoring yields to user-facing inference
+        with admission.priority(admission.BACKGROUND):
+            candidate_results = predict_with(_candidate, texts)
+        candidate_seconds = time.perf_counter() - start
+
+        agreements = sum(p["label"] == c["label"] for p, c in zip(primary_results, candidate_results))
+        deltas = [c["confidence"] - p["confidence"] for p, c in zip(primary_results, candidate_results)]
+        with _lock:
+            _stats["requests"] += 1
+            _stats["rows"] += len(texts)
+            _stats["agreements"] += agreements
+            _stats["primary_seconds"] += primary_seconds
+            _stats["candidate_seconds"] += candidate_seconds
+            _stats["confidence_delta_sum"] += sum(deltas)
+
+        record = {
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "entry_point": entry_point,
+            "primary_version": primary_results[0].get("model_version"),
+            "candidate_version": _candidate.version,
+            "rows": len(texts),
+            "agreements": agreements,
+            "primary_seconds": round(primary_seconds, 4),
+            "candidate_seconds": round(candidate_seconds, 4),
+            "mean_confidence_delta": round(sum(deltas) / len(deltas), 4),
+            "max_confidence_delta": round(max(deltas, key=abs), 4),
+        }
+        with open(SHADOW_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except Exception as e:
+        print(f"Shadow comparison failed: {e}")
+        with _lock:
+            _stats["errors"] += 1
+    finally:
+        with _lock:
+            _pending -= 1
+
+
+# Hand a sampled request to the candidate model after the primary result is ready.
+# Returns immediately; the caller's response never waits on the candidate.
+def observe(texts, primary_results, primary_seconds, entry_point="single"):
+    global _pending
+    if not enabled() or not primary_results or random.random() >= SHADOW_FRACTION:
+        return
+    with _lock:
+        if _pending >= MAX_PENDING:
+            _stats["dropped"] += 1
+            return
+        _pending += 1
+    _executor.submit(_compare, list(texts), list(primary_results), primary_seconds, entry_point)
+
+
+def summary():
+    with _lock:
+        stats = dict(_stats)
+    rows = stats["rows"] or 1
+    requests = stats["requests"] or 1
+    return {
+        "candidate_version": SHADOW_VERSION,
+        "requests": stats["requests"],
+        "rows": stats["rows"],
+        "dropped": stats["dropped"],
+        "errors": stats["errors"],
+        "agreement_rate": stats["agreements"] / rows,
+        "mean_primary_seconds": stats["primary_seconds"] / requests,
+        "mean_candidate_seconds": stats["candidate_seconds"] / requests,
+        "mean_confidence_delta": stats["confidence_delta_sum"] / rows,
+    }
+
+
+def _summary_gauge(key):
+    def callback():
+        if not enabled():
+            return {}
+        return {(("candidate_version", SHADOW_VERSION),): summary()[key]}
+    return callback
+
+
+# This process's comparison so far, scraped from /metrics alongside the live traffic it covers
+metrics.register_gauge("nazar_shadow_requests", _summary_gauge("requests"))
+metrics.register_gauge("nazar_shadow_rows", _summary_gauge("rows"))
+metrics.register_gauge("nazar_shadow_dropped", _summary_gauge("dropped"))
+metrics.register_gauge("nazar_shadow_errors", _summary_gauge("errors"))
+metrics.register_gauge("nazar_shadow_agreement_rate", _summary_gauge("agreement_rate"))
+metrics.register_gauge("nazar_shadow_confidence_delta", _summary_gauge("mean_confidence_delta"))
+metrics.register_gauge("nazar_shadow_candidate_seconds", _summary_gauge("mean_candidate_seconds"))
+metrics.register_gauge("nazar_shadow_primary_seconds", _summary_gauge("mean_primary_seconds"))
+
+
+# Summarize a shadow log written by one or more app processes
+def summarize_log(path):
+    requests = rows = agreements = 0
+    primary_seconds = candidate_seconds = delta_sum = 0.0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            requests += 1
+            rows += record["rows"]
+            agreements += record["agreements"]
+            primary_seconds += record["primary_seconds"]
+            candidate_seconds += record["candidate_seconds"]
+            delta_sum += record["mean_confidence_delta"] * record["rows"]
+    if not requests:
+        return {"requests": 0}
+    return {
+        "requests": requests,
+        "rows": rows,
+        "agreement_rate": agreements / rows,
+        "mean_primary_seconds": primary_seconds / requests,
+        "mean_candidate_seconds": candidate_seconds / requests,
+        "mean_confidence_delta": delta_sum / rows,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize shadow evaluation results")
+    parser.add_argument("log", nargs="?", default=SHADOW_LOG)
+    args = parser.parse_args()
+    print(json.dumps(summarize_log(args.log), indent=2))
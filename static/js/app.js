@@ -0,0 +1,102 @@
+// Theme toggle functionality removed as requested
+document.addEventListener('DOMContentLoaded', function() {
+  // Set default light theme
+  const root = document.documentElement;
+  root.style.setProperty('--background-color', '#f9f9f9');
+  root.style.setProperty('--card-background', '#ffffff');
+  root.style.setProperty('--text-color', '#333333');
+  root.style.setProperty('--border-color', '#e5e7eb');
+  root.style.setProperty('--accent-color', '#6b7280');
+  root.style.setProperty('--shadow-color', 'rgba(0, 0, 0, 0.1)');
+  document.body.classList.add('light-theme');
+
+  // Toast notification function - defined at global scope
+  window.showToast = function(message, duration = 3000) {
+    const toast = document.getElementById('toast');
+    if (!toast) {
+      console.error('Toast element not found');
+      return;
+    }
+    toast.textContent = message;
+    toast.classList.add('show');
+
+    setTimeout(function() {
+      toast.classList.remove('show');
+    }, duration);
+  };
+});
+
+// Detect if the device is mobile
+function isMobile() {
+    return /Android|webOS|iPhone|iPad|iPod|BlackBerry|IEMobile|Opera Mini/i.test(navigator.userAgent) || window.innerWidth < 768;
+}
+
+// Set the mobile_view state based on device detection
+if (isMobile()) {
+    window.parent.postMessage({type: 'streamlit:setStateValue', key: 'mobile_view', value: true}, '*');
+} else {
+    window.parent.postMessage({type: 'streamlit:setStateValue', key: 'mobile_view', value: false}, '*');
+}
+
+// Listen for window resize events to update the state
+window.addEventListener('resize', function() {
+    if (isMobile()) {
+        window.parent.postMessage({type: 'streamlit:setStateValue', key: 'mobile_view', value: true}, '*');
+    } else {
+        window.parent.postMessage({type: 'streamlit:setStateValue', key: 'mobile_view', value: false}, '*');
+    }
+});
+
+// Set active tab based on current state
+document.addEventListener('DOMContentLoaded', function() {
+    // Get current tab from URL or default to single_comment
+    const urlParams = new URLSearchParams(window.location.search);
+    const currentTab = urlParams.get('active_tab') || 'single_comment';
+
+    // Remove active class from all tabs
+    document.querySelectorAll('.menu-item').forEach(tab => {
+        tab.classList.remove('active');
+    });
+
+    // Add active class to current tab
+    if (currentTab === 'single_comment') {
+        document.getElementById('tab-classify').classList.add('active');
+    } else if (currentTab === 'about') {
+        document.getElementById('tab-about').classList.add('active');
+    } else if (currentTab === 'services') {
+        document.getElementById('tab-services').classList.add('active');
+    } else if (currentTab === 'results') {
+        document.getElementById('tab-results').classList.add('active');
+    }
+});
+
+// Function to show toast notification
+function showToast(message) {
+    // Create toast element if it doesn't exist
+    let toast = document.getElementById('toast-notification');
+    if (!toast) {
+        toast = document.createElement('div');
+        toast.id = 'toast-notification';
+        toast.className = 'toast';
+        document.body.appendChild(toast);
+    }
+
+    // Set message and show toast
+    toast.textContent = message;
+    toast.style.opacity = '1';
+
+    // Hide toast after 3 seconds
+    setTimeout(() => {
+        toast.style.opacity = '0';
+    }, 3000);
+}
+
+// Function to toggle info box
+function toggleInfo(id) {
+    const infoBox = document.getElementById(id);
+    if (infoBox.style.display === 'none') {
+        infoBox.style.display = 'block';
+    } else {
+        infoBox.style.display = 'none';
+    }
+}